@@ -0,0 +1,47 @@
+#! /usr/bin/env python
+"""Time asynchronous FileOutputs using a writer process against a writer thread"""
+import os
+import tempfile
+import threading
+import time
+
+os.environ['TWIGGY_UNDER_TEST'] = '1'  # we don't need the globals
+
+from twiggy import formats, levels, outputs
+from twiggy.message import Message
+
+messages = 20000
+msg = Message(levels.DEBUG, 'hello, ladies', {'time': time.gmtime(), 'name': 'donjuan'},
+              Message._default_options, (), {})
+
+
+def run(async_mode, producers):
+    fname = tempfile.mktemp()
+    try:
+        output = outputs.FileOutput(
+            fname, format=formats.line_format, msg_buffer=-1, close_atexit=False,
+            async_mode=async_mode)
+
+        def produce():
+            for i in range(messages // producers):
+                output.output(msg)
+        threads = [threading.Thread(target=produce) for i in range(producers)]
+
+        start = time.time()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        logged = time.time() - start
+        output.close()
+        return logged, time.time() - start
+    finally:
+        os.remove(fname)
+
+
+for producers in (1, 4, 16):
+    for async_mode in ('process', 'thread'):
+        logged, written = min(run(async_mode, producers) for i in range(3))
+        print("{0:2d} producers, {1:7s}: {2:.3f} sec logging, {3:.3f} sec until written"
+              " for {4:n} messages ({5:.2f} usec/call)".format(
+                  producers, async_mode, logged, written, messages, logged / messages * 1e6))
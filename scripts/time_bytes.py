@@ -0,0 +1,42 @@
+#! /usr/bin/env python
+"""Time FileOutputs writing text through a TextIOWrapper against bytes to a raw fd"""
+import os
+import tempfile
+import time
+
+os.environ['TWIGGY_UNDER_TEST'] = '1'  # we don't need the globals
+
+from twiggy import formats, levels, outputs
+from twiggy.message import Message
+
+messages = 50000
+msg = Message(levels.DEBUG, 'hello, ladies', {'time': time.gmtime(), 'name': 'donjuan'},
+              Message._default_options, (), {})
+
+
+def run(msg_buffer, async_mode, **kwargs):
+    fname = tempfile.mktemp()
+    try:
+        output = outputs.FileOutput(fname, msg_buffer=msg_buffer, async_mode=async_mode,
+                                    close_atexit=False, **kwargs)
+        start = time.time()
+        for i in range(messages):
+            output.output(msg)
+        output.close()
+        return time.time() - start
+    finally:
+        os.remove(fname)
+
+
+paths = [
+    ("text, line buffered", dict(format=formats.line_format)),
+    ("text, encoded per batch", dict(format=formats.line_format, raw=True)),
+    ("bytes", dict(format=formats.line_bytes_format)),
+]
+
+for mode, msg_buffer, async_mode in (("sync", 0, 'process'), ("thread", -1, 'thread')):
+    for name, kwargs in paths:
+        elapsed = min(run(msg_buffer, async_mode, **kwargs) for i in range(3))
+        print("{0:6s} {1:24s}: {2:.3f} sec until written for {3:n} messages"
+              " ({4:.2f} usec/message)".format(mode, name, elapsed, messages,
+                                               elapsed / messages * 1e6))
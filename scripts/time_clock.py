@@ -0,0 +1,44 @@
+#! /usr/bin/env python
+"""Time the clocks for the time field, and logging & encoding messages with what they return"""
+import os
+import pickle
+import time
+import timeit
+
+os.environ['TWIGGY_UNDER_TEST'] = '1'  # we don't need the globals
+
+from twiggy import filters, formats, levels, logger, outputs
+from twiggy.lib.clock import CoarseClock, now
+from twiggy.message import Message
+
+loops = 200000
+coarse = CoarseClock()
+clocks = (("time.gmtime", time.gmtime), ("now", now), ("CoarseClock", coarse))
+
+
+def report(what, elapsed, loops):
+    print("{0:32s}: {1:.3f} sec for {2:n} ({3:.2f} usec/call)".format(
+        what, elapsed, loops, elapsed / loops * 1e6))
+
+
+for name, clock in clocks:
+    report("clock, " + name, min(timeit.repeat(clock, number=loops, repeat=3)), loops)
+
+for name, clock in clocks:
+    log = logger.Logger(fields={'time': clock})
+    log._emitters['null'] = filters.Emitter(
+        levels.DEBUG, None, outputs.NullOutput(formats.line_format, close_atexit=False))
+    log = log.name('donjuan')
+    report("log to line_format, " + name,
+           min(timeit.repeat(lambda: log.debug("hello, {0}", "ladies", x=42),
+                             number=loops // 10, repeat=3)),
+           loops // 10)
+
+for name, clock in clocks:
+    msg = Message(levels.DEBUG, "hello", {'time': clock(), 'name': 'donjuan'},
+                  Message._default_options, (), {})
+    report("encode, " + name, min(timeit.repeat(msg.encode, number=loops, repeat=3)), loops)
+    print("    {0} bytes encoded, {1} pickled".format(
+        len(msg.encode()), len(pickle.dumps(msg, pickle.HIGHEST_PROTOCOL))))
+
+coarse.stop()
@@ -0,0 +1,32 @@
+#! /usr/bin/env python
+"""Compare the size & speed of Message.encode against pickle"""
+import os
+import pickle
+import time
+import timeit
+
+os.environ['TWIGGY_UNDER_TEST'] = '1'  # we don't need the globals
+
+from twiggy import levels
+from twiggy.message import Message
+
+loops = 100000
+
+msg = Message(levels.DEBUG, 'hello, {0}',
+              {'time': time.gmtime(), 'name': 'donjuan', 'pid': 1234, 'request_id': 42},
+              Message._default_options, ('ladies', ), {})
+msg.text
+
+pickled = pickle.dumps(msg, pickle.HIGHEST_PROTOCOL)
+encoded = msg.encode()
+
+results = (
+    ('pickle', len(pickled),
+     lambda: pickle.dumps(msg, pickle.HIGHEST_PROTOCOL), lambda: pickle.loads(pickled)),
+    ('encode', len(encoded), msg.encode, lambda: Message.decode(encoded)),
+)
+for name, size, dumps, loads in results:
+    t_dumps = min(timeit.repeat(dumps, number=loops, repeat=5))
+    t_loads = min(timeit.repeat(loads, number=loops, repeat=5))
+    print("{0}: {1} bytes, {2:.2f} usec to encode, {3:.2f} usec to decode".format(
+        name, size, t_dumps / loops * 1e6, t_loads / loops * 1e6))
@@ -0,0 +1,56 @@
+#! /usr/bin/env python
+"""Time ConversionTable.convert with compiled plans against the old per-call algorithm"""
+import os
+import time
+import timeit
+
+os.environ['TWIGGY_UNDER_TEST'] = '1'  # we don't need the globals
+
+from twiggy import formats, levels
+from twiggy.lib.converter import ConversionTable
+
+
+class UnplannedConversionTable(ConversionTable):
+    """ConversionTable.convert as it was before plans"""
+
+    def convert(self, d):
+        converts = set(x.key for x in self)
+        avail = set(k for k in d)
+        required = set(x.key for x in self if x.required)
+        missing = required - avail
+
+        if missing:
+            raise ValueError("Missing fields {0}".format(list(missing)))
+
+        item_list = []
+        for c in self:
+            if c.key in d:
+                item = c.convert_item(c.key, c.convert_value(d[c.key]))
+                if item is not None:
+                    item_list.append(item)
+
+        for key in sorted(avail - converts):
+            item = self.generic_item(key, self.generic_value(d[key]))
+            if item is not None:
+                item_list.append(item)
+
+        return self.aggregate(item_list)
+
+
+planned = formats.line_conversion.copy()
+unplanned = UnplannedConversionTable(formats.line_conversion.copy())
+for table in (planned, unplanned):
+    table.generic_value = str
+    table.generic_item = "{0}={1}".format
+    table.aggregate = ':'.join
+
+loops = 200000
+for nfields in (0, 3, 10):
+    d = {'time': time.gmtime(), 'level': levels.INFO, 'name': 'donjuan'}
+    d.update(('field{0}'.format(i), i) for i in range(nfields))
+    assert planned.convert(d) == unplanned.convert(d)
+    for name, table in (("planned", planned), ("unplanned", unplanned)):
+        elapsed = min(timeit.repeat(lambda: table.convert(d), number=loops, repeat=3))
+        print("{0:2d} extra fields, {1:9s}: {2:.3f} sec for {3:n} ({4:.2f} usec/call)".format(
+            nfields, name, elapsed, loops, elapsed / loops * 1e6))
+print("plan cache: {0}".format(planned.plan_info()))
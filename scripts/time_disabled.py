@@ -0,0 +1,31 @@
+#! /usr/bin/env python
+"""Time log calls that can't be emitted against an empty function call"""
+import os
+import timeit
+
+os.environ['TWIGGY_UNDER_TEST'] = '1'  # we don't need the globals
+
+from twiggy import filters, levels, logger, outputs
+
+loops = 1000000
+
+log = logger.Logger().name('donjuan')
+log._emitters['*'] = filters.Emitter(levels.INFO, None, outputs.NullOutput(close_atexit=False))
+log.info('compile the dispatch table')
+
+
+def empty(format_spec='', *args, **kwargs):
+    pass
+
+
+timings = (
+    ('empty function', lambda: empty('hello, {0}', 'ladies')),
+    ('disabled debug', lambda: log.debug('hello, {0}', 'ladies')),
+    ('disabled _emit', lambda: log._emit(levels.DEBUG, 'hello, {0}', ('ladies', ), {})),
+)
+
+base = None
+for name, stmt in timings:
+    t = min(timeit.repeat(stmt, number=loops, repeat=5))
+    base = base or t
+    print("{0}: {1:.3f} sec for {2:n} loops ({3:.2f}x)".format(name, t, loops, t / base))
@@ -0,0 +1,53 @@
+#! /usr/bin/env python
+"""Time Logger._emit with the dispatch table against the old per-call emitter scan"""
+import os
+import timeit
+
+os.environ['TWIGGY_UNDER_TEST'] = '1'  # we don't need the globals
+
+from six import iteritems
+
+from twiggy import filters, levels, logger, outputs
+from twiggy.message import Message
+
+
+class ScanningLogger(logger.Logger):
+    """Logger._emit as it was before the dispatch table"""
+
+    __slots__ = []
+
+    def _emit(self, level, format_spec, args, kwargs):
+        if level < self.min_level:
+            return
+        if not self.filter(format_spec):
+            return
+        potential_emitters = [(name, emitter) for name, emitter in iteritems(self._emitters)
+                              if level >= emitter.min_level]
+        if not potential_emitters:
+            return
+        msg = Message(level, format_spec, self._fields.copy(), self._options,
+                      args, kwargs)
+        outputs = set()
+        for name, emitter in sorted(potential_emitters):
+            if emitter.filter(msg):
+                outputs.add(emitter._output)
+        for o in outputs:
+            o.output(msg)
+
+
+loops = 100000
+
+for count in (1, 5, 20):
+    results = []
+    for cls in (ScanningLogger, logger.Logger):
+        log = cls().name('donjuan')
+        for i in range(count):
+            log._emitters['emitter%02d' % i] = filters.Emitter(
+                levels.DEBUG, None, outputs.NullOutput(close_atexit=False))
+        results.append(min(timeit.repeat(lambda: log.debug('hello, ladies'),
+                                          number=loops, repeat=5)))
+
+    old, new = results
+    print("{0:2d} emitters: {1:.3f} sec scanning, {2:.3f} sec dispatch table for {3:n} loops"
+          " ({4:.2f} usec/call saved)".format(count, old, new, loops,
+                                              (old - new) / loops * 1e6))
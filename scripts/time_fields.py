@@ -0,0 +1,76 @@
+#! /usr/bin/env python
+"""Time & measure memory of deep chains of bound fields, against copying dicts, and time
+binding fields per request with loggers"""
+import os
+import timeit
+import tracemalloc
+
+os.environ['TWIGGY_UNDER_TEST'] = '1'  # we don't need the globals
+
+from twiggy import filters, levels, logger, outputs
+from twiggy.lib.fields import FieldChain
+
+loops = 1000
+
+
+def bind_dicts(depth):
+    """each bind copies everything bound so far, like loggers used to"""
+    fields = {'time': None}
+    loggers = []
+    for i in range(depth):
+        fields = fields.copy()
+        fields['field%d' % i] = i
+        loggers.append(fields)
+    # one message
+    fields.copy()
+    return loggers
+
+
+def bind_chain(depth):
+    chain = FieldChain({'time': None})
+    loggers = []
+    for i in range(depth):
+        chain = FieldChain({'field%d' % i: i}, chain)
+        loggers.append(chain)
+    # one message
+    chain.flatten().copy()
+    return loggers
+
+
+def memory(func, depth):
+    tracemalloc.start()
+    loggers = func(depth)
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del loggers
+    return size
+
+
+for depth in (1, 10, 50, 200):
+    results = []
+    for func in (bind_dicts, bind_chain):
+        t = min(timeit.repeat(lambda: func(depth), number=loops, repeat=5))
+        results.append((t, memory(func, depth)))
+    (dt, dm), (ct, cm) = results
+    print("depth {0:3d}: dicts {1:.3f} sec / {2:n} bytes, chain {3:.3f} sec / {4:n} bytes"
+          " for {5:n} loops".format(depth, dt, dm, ct, cm, loops))
+
+
+# the web handler pattern: bind fields & a name per request, then log
+log = logger.Logger({'time': lambda: None})
+log._emitters['*'] = filters.Emitter(levels.DEBUG, None, outputs.NullOutput(close_atexit=False))
+loops = 100000
+requests = iter(range(10 ** 9))
+
+
+def bind():
+    log.fields(request_id=next(requests)).name('svc.handler')
+
+
+def bind_and_log():
+    log.fields(request_id=next(requests)).name('svc.handler').info('hello, ladies')
+
+
+for func in (bind, bind_and_log):
+    t = min(timeit.repeat(func, number=loops, repeat=5))
+    print("{0}: {1:.3f} sec for {2:n} loops".format(func.__name__, t, loops))
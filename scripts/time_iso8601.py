@@ -0,0 +1,34 @@
+#! /usr/bin/env python
+"""Time ISO8601Renderer against iso8601time, for 1M timestamps 10 usec apart"""
+import os
+import time
+
+os.environ['TWIGGY_UNDER_TEST'] = '1'  # we don't need the globals
+
+from twiggy.lib import ISO8601Renderer, iso8601time
+
+count = 1000000
+start = time.time()
+floats = [start + i * 0.00001 for i in range(count)]
+structs = [time.gmtime(t) for t in floats]
+
+
+def run(render, times):
+    began = time.time()
+    for t in times:
+        render(t)
+    return time.time() - began
+
+
+cases = [
+    ("iso8601time, struct_time", iso8601time, structs),
+    ("renderer, struct_time", ISO8601Renderer(), structs),
+    ("renderer, float", ISO8601Renderer(), floats),
+    ("renderer, float, ms", ISO8601Renderer('ms'), floats),
+    ("renderer, float, us, local", ISO8601Renderer('us', 'local'), floats),
+]
+
+for name, render, times in cases:
+    elapsed = min(run(render, times) for i in range(3))
+    print("{0:28s}: {1:.3f} sec for {2:n} ({3:.3f} usec/call)".format(
+        name, elapsed, count, elapsed / count * 1e6))
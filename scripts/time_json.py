@@ -0,0 +1,39 @@
+#! /usr/bin/env python
+"""Time formatting messages with JSONFormat against line_format and json.dumps in a converter"""
+import json
+import os
+import timeit
+
+os.environ['TWIGGY_UNDER_TEST'] = '1'  # we don't need the globals
+
+from twiggy import formats, levels
+from twiggy.lib.clock import now
+from twiggy.lib.converter import ConversionTable
+from twiggy.message import Message
+
+# what we'd do without JSONFormat: convert the fields to a dict and dump it
+dumps_conversion = ConversionTable([('time', formats.ISO8601Renderer(precision='ms'),
+                                     lambda k, v: (k, v)),
+                                    ('level', str, lambda k, v: (k, v))])
+dumps_conversion.aggregate = lambda items: json.dumps(dict(items), default=str)
+dumps_format = formats.LineFormat(conversion=dumps_conversion).format_fields
+
+
+format_list = [("line_format", formats.line_format),
+               ("json.dumps, fields only", dumps_format),
+               ("JSONFormat, json", formats.JSONFormat(backend='json'))]
+if formats.orjson is not None:
+    format_list.append(("JSONFormat, orjson", formats.JSONFormat(backend='orjson')))
+
+loops = 100000
+for nfields in (0, 3, 10):
+    fields = {'time': now(), 'level': levels.INFO, 'name': 'donjuan'}
+    fields.update(('field{0}'.format(i), i if i % 2 else "value {0}".format(i))
+                  for i in range(nfields))
+    msg = Message(levels.INFO, "hello, {0}", fields, Message._default_options, ['ladies'], {})
+    msg.text
+    for name, format in format_list:
+        elapsed = min(timeit.repeat(lambda: format(msg), number=loops, repeat=3))
+        print("{0:2d} extra fields, {1:23s}: {2:.3f} sec for {3:n} ({4:.2f} usec/message, "
+              "{5:,.0f} messages/sec)".format(nfields, name, elapsed, loops,
+                                              elapsed / loops * 1e6, loops / elapsed))
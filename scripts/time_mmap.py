@@ -0,0 +1,42 @@
+#! /usr/bin/env python
+"""Time a synchronous MmapOutput against FileOutputs"""
+import os
+import tempfile
+import time
+
+os.environ['TWIGGY_UNDER_TEST'] = '1'  # we don't need the globals
+
+from twiggy import formats, levels, outputs
+from twiggy.message import Message
+
+messages = 100000
+msg = Message(levels.DEBUG, 'hello, ladies', {'time': time.gmtime(), 'name': 'donjuan'},
+              Message._default_options, (), {})
+
+
+def run(make_output):
+    fname = tempfile.mktemp()
+    try:
+        output = make_output(fname)
+        start = time.time()
+        for i in range(messages):
+            output.output(msg)
+        output.close()
+        return time.time() - start
+    finally:
+        os.remove(fname)
+
+
+candidates = [
+    ("FileOutput, line buffered", lambda fname: outputs.FileOutput(
+        fname, formats.line_format, close_atexit=False)),
+    ("FileOutput, block buffered", lambda fname: outputs.FileOutput(
+        fname, formats.line_format, buffering=-1, close_atexit=False)),
+    ("MmapOutput", lambda fname: outputs.MmapOutput(
+        fname, formats.line_format, close_atexit=False)),
+]
+
+for name, make_output in candidates:
+    elapsed = min(run(make_output) for i in range(3))
+    print("{0:27s}: {1:.3f} sec for {2:n} messages ({3:.2f} usec/call)".format(
+        name, elapsed, messages, elapsed / messages * 1e6))
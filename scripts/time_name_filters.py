@@ -0,0 +1,43 @@
+#! /usr/bin/env python
+"""Time Logger._emit with memoized name filters against calling them for every message"""
+import fnmatch
+import os
+import re
+import timeit
+
+os.environ['TWIGGY_UNDER_TEST'] = '1'  # we don't need the globals
+
+from twiggy import filters, levels, logger, outputs
+
+loops = 20
+patterns = ['app.module%02d.*' % i for i in range(50)]
+names = ['app.module%02d.sub%03d' % (i % 100, i) for i in range(500)]
+
+
+def unmemoized_glob_names(*names):
+    """glob_names as it was before memoizing"""
+    pats = [re.compile(fnmatch.translate(pat)) for pat in names]
+
+    def glob_names_filter(msg):
+        return any(pat.match(msg.name) is not None for pat in pats)
+    return glob_names_filter
+
+
+results = []
+for make_filter in (unmemoized_glob_names, filters.glob_names):
+    log = logger.Logger()
+    log._emitters['globs'] = filters.Emitter(levels.DEBUG, make_filter(*patterns),
+                                             outputs.NullOutput(close_atexit=False))
+    loggers = [log.name(name) for name in names]
+
+    def run():
+        for l in loggers:
+            l.debug('hello, ladies')
+    run()  # warm up
+    results.append(min(timeit.repeat(run, number=loops, repeat=5)))
+
+old, new = results
+calls = loops * len(names)
+print("{0} globs x {1} names: {2:.3f} sec calling filters, {3:.3f} sec memoized for {4:n} calls"
+      " ({5:.2f} usec/call saved)".format(len(patterns), len(names), old, new, calls,
+                                          (old - new) / calls * 1e6))
@@ -0,0 +1,36 @@
+#! /usr/bin/env python
+"""Time substituting into format specs, with and without the renderer cache
+
+Only dollar specs use the cache; braces & percent are timed uncached for comparison.
+"""
+import os
+import timeit
+from string import Template
+
+os.environ['TWIGGY_UNDER_TEST'] = '1'  # we don't need the globals
+
+from twiggy.message import RendererCache
+
+loops = 200000
+
+styles = (
+    ('braces', "hello, {0} {who}", ("ladies", ), {'who': "and gents"},
+     lambda spec, args, kwargs: spec.format(*args, **kwargs)),
+    ('percent', "hello, %(what)s %(who)s", (), {'what': "ladies", 'who': "and gents"},
+     lambda spec, args, kwargs: spec % (args or kwargs)),
+    ('dollar', "hello, $what $who", (), {'what': "ladies", 'who': "and gents"},
+     lambda spec, args, kwargs: Template(spec).substitute(kwargs)),
+)
+
+cache = RendererCache()
+for style, spec, args, kwargs, uncached in styles:
+    t_uncached = min(timeit.repeat(lambda: uncached(spec, args, kwargs), number=loops, repeat=5))
+    if style not in cache.compilers:
+        print("{0:8s}: {1:.3f} sec for {2:n} loops".format(style, t_uncached, loops))
+        continue
+    t_cached = min(timeit.repeat(lambda: cache.get(style, spec)(*args, **kwargs),
+                                 number=loops, repeat=5))
+    print("{0:8s}: {1:.3f} sec uncached, {2:.3f} sec cached for {3:n} loops".format(
+        style, t_uncached, t_cached, loops))
+
+print("cache: {0}".format(cache.info()))
@@ -0,0 +1,30 @@
+#! /usr/bin/env python
+"""Time logging to N outputs sharing one format, against N outputs with copies of it"""
+import copy
+import os
+import time
+import timeit
+
+os.environ['TWIGGY_UNDER_TEST'] = '1'  # we don't need the globals
+
+from twiggy import filters, formats, levels, logger, outputs
+
+loops = 20000
+
+
+def make_logger(formats_):
+    log = logger.Logger(fields={'time': time.gmtime})
+    for i, format in enumerate(formats_):
+        log._emitters[i] = filters.Emitter(levels.DEBUG, None,
+                                           outputs.NullOutput(format, close_atexit=False))
+    return log.name('donjuan')
+
+
+for count in (1, 2, 3, 5):
+    shared = make_logger([formats.line_format] * count)
+    copies = make_logger([copy.copy(formats.line_format) for i in range(count)])
+    for name, log in (("shared", shared), ("copies", copies)):
+        elapsed = min(timeit.repeat(lambda: log.debug("hello, {0}", "ladies", x=42),
+                                    number=loops, repeat=3))
+        print("{0} outputs, {1}: {2:.3f} sec for {3:n} messages ({4:.2f} usec/message)".format(
+            count, name, elapsed, loops, elapsed / loops * 1e6))
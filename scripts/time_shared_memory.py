@@ -0,0 +1,42 @@
+#! /usr/bin/env python
+"""Time asynchronous FileOutputs sending messages through a queue against shared memory:
+throughput, and the latency of each log call"""
+import os
+import tempfile
+import time
+
+os.environ['TWIGGY_UNDER_TEST'] = '1'  # we don't need the globals
+
+from twiggy import formats, levels, outputs
+from twiggy.message import Message
+
+messages = 50000
+msg = Message(levels.DEBUG, 'hello, {0}', {'time': time.gmtime(), 'name': 'donjuan'},
+              Message._default_options, ('ladies', ), {})
+
+
+def run(async_mode):
+    fname = tempfile.mktemp()
+    try:
+        output = outputs.FileOutput(fname, format=formats.line_format, msg_buffer=-1,
+                                    close_atexit=False, async_mode=async_mode)
+        latencies = []
+        clock = time.perf_counter
+        start = clock()
+        for i in range(messages):
+            t = clock()
+            output.output(msg)
+            latencies.append(clock() - t)
+        output.close()
+        elapsed = clock() - start
+    finally:
+        os.remove(fname)
+
+    latencies.sort()
+    return elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+
+for async_mode in ('process', 'shared_memory'):
+    elapsed, p50, p99 = min(run(async_mode) for i in range(3))
+    print("{0:13s}: {1:n} messages/sec until written, log call p50 {2:.2f} usec,"
+          " p99 {3:.2f} usec".format(async_mode, int(messages / elapsed), p50 * 1e6, p99 * 1e6))
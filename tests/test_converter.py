@@ -1,5 +1,9 @@
+import copy
+import pickle
 import sys
+import time
 
+from twiggy.lib.clock import Timestamp
 from twiggy.lib.converter import Converter, ConversionTable, same_item, same_value, drop
 
 if sys.version_info >= (2, 7):
@@ -165,3 +169,105 @@ class ConversionTableTestCase(unittest.TestCase):
         ct = ConversionTable([c])
         with self.assertRaises(ValueError):
             ct.convert({'shirt': 42}) == {'shirt': 42}
+
+
+class PlanTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.ct = ConversionTable([("joe", "I wear {0}".format, conv_item),
+                                   ("frank", "You wear {0}".format, conv_item)])
+        self.ct.aggregate = list
+        self.d = {'joe': 'pants', 'frank': 'shirt', 'bob': 'shoes'}
+
+    def test_reused(self):
+        for i in range(100):
+            self.ct.convert(self.d)
+        info = self.ct.plan_info()
+        assert info['misses'] == 1
+        assert info['hits'] == 99
+        assert info['hit_rate'] == 0.99
+        assert info['size'] == 1
+
+    def test_keys(self):
+        assert self.ct.convert({'joe': 'pants'}) == [('joe', 'I wear pants')]
+        assert self.ct.convert({'frank': 'shirt', 'bob': 'shoes'}) == [
+            ('frank', 'You wear shirt'), ('bob', 'shoes')]
+        assert self.ct.plan_info()['size'] == 2
+
+    def test_bounded(self):
+        self.ct.plan_cache_size = 3
+        for i in range(10):
+            self.ct.convert({i: i})
+        assert self.ct.plan_info()['size'] == 3
+
+    def test_list_changes(self):
+        before = self.ct.convert(self.d)
+        self.ct.add("bob", "They wear {0}".format, conv_item)
+        assert self.ct.convert(self.d) == [('joe', 'I wear pants'), ('frank', 'You wear shirt'),
+                                           ('bob', 'They wear shoes')]
+        self.ct.delete("bob")
+        assert self.ct.convert(self.d) == before
+        self.ct[0] = Converter("joe", "He wears {0}".format, conv_item)
+        assert self.ct.convert(self.d)[0] == ('joe', 'He wears pants')
+        self.ct.reverse()
+        assert self.ct.convert(self.d)[0] == ('frank', 'You wear shirt')
+        del self.ct[0]
+        assert self.ct.convert(self.d) == [('joe', 'He wears pants'), ('bob', 'shoes'),
+                                           ('frank', 'shirt')]
+
+    def test_copies(self):
+        for make_copy in (copy.copy, copy.deepcopy, ConversionTable.copy):
+            self.ct.convert(self.d)
+            other = make_copy(self.ct)
+            assert other.plan_info()['size'] == 0
+            other.pop()
+            assert other.convert(self.d) == [('joe', 'I wear pants'), ('bob', 'shoes'),
+                                             ('frank', 'shirt')]
+            assert self.ct.convert(self.d) == [('joe', 'I wear pants'),
+                                               ('frank', 'You wear shirt'), ('bob', 'shoes')]
+
+    def test_pickle(self):
+        ct = ConversionTable([("joe", same_value, same_item)])
+        ct.convert({'joe': 1})
+        ct2 = pickle.loads(pickle.dumps(ct))
+        assert ct2.plan_info()['size'] == 0
+        assert ct2.convert({'joe': 1}) == {'joe': 1}
+
+    def test_new_table_current(self):
+        # creating its Converters doesn't make a new table's plans look stale
+        ct = ConversionTable([("joe", "I wear {0}".format, conv_item)])
+        assert ct._generation == Converter._generation
+
+    def test_attribute_changes(self):
+        self.ct.convert(self.d)
+        self.ct.generic_item = drop
+        assert self.ct.convert(self.d) == [('joe', 'I wear pants'), ('frank', 'You wear shirt')]
+        self.ct.get('joe').convert_item = drop
+        assert self.ct.convert(self.d) == [('frank', 'You wear shirt')]
+        self.ct.get('frank').required = True
+        with self.assertRaises(ValueError):
+            self.ct.convert({'joe': 'pants'})
+        # the missing keys are planned too
+        with self.assertRaises(ValueError):
+            self.ct.convert({'joe': 'pants'})
+
+
+class TimestampTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.t = Timestamp(1288232157.25)
+
+    def test_struct_time(self):
+        ct = ConversionTable([("time", lambda t: time.strftime("%H:%M:%S", t), same_item)])
+        ct.generic_value = lambda t: t.tm_year
+        expected = {'time': '02:15:57', 'then': 2010}
+        assert ct.convert({'time': self.t, 'then': self.t}) == expected
+
+    def test_accepts_timestamps(self):
+        def seconds(t):
+            return t % 60
+        seconds.accepts_timestamps = True
+
+        ct = ConversionTable([("time", seconds, same_item)])
+        ct.generic_value = seconds
+        assert ct.convert({'time': self.t, 'then': self.t}) == {'time': 57.25, 'then': 57.25}
@@ -112,6 +112,36 @@ class namesTestCase(unittest.TestCase):
         assert filters.glob_names("jo*", "frank")(m)
         assert not filters.glob_names("*bob", "frank")(m)
 
+    def test_name_only_marked(self):
+        assert filters.names("foo").name_only
+        assert filters.glob_names("foo").name_only
+        assert filters.msg_filter(None).name_only
+        assert filters.msg_filter(False).name_only
+        assert filters.msg_filter([filters.names("jose"), True]).name_only
+        assert not getattr(filters.msg_filter("^Hello"), 'name_only', False)
+        assert not getattr(filters.msg_filter([filters.names("jose"), "^Hello"]),
+                           'name_only', False)
+
+    def test_name_only_cached(self):
+        calls = []
+
+        def is_jose(msg):
+            calls.append(msg.name)
+            return msg.name == 'jose'
+
+        f = filters.name_only(is_jose)
+        assert f.name_only
+        assert f(m)
+        assert f(m)
+        assert calls == ['jose']
+
+    def test_name_only_bounded(self):
+        f = filters.name_only(lambda msg: True)
+        msg = make_mesg()
+        for i in range(filters.name_cache_size + 10):
+            msg.fields['name'] = str(i)
+            assert f(msg)
+
 
 class EmitterTestCase(unittest.TestCase):
 
@@ -132,3 +162,85 @@ class EmitterTestCase(unittest.TestCase):
         f = e.filter
         assert callable(f)
         assert not f(m)
+
+
+class EmitterDictTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.emitters = filters.EmitterDict()
+        self.emitters['b'] = filters.Emitter(levels.INFO, None, 'output-b')
+        self.emitters['a'] = filters.Emitter(levels.DEBUG, None, 'output-a')
+
+    def outputs(self, level):
+        return [output for name, filt, output in self.emitters._compile()[level]]
+
+    def test_is_dict(self):
+        assert isinstance(self.emitters, dict)
+
+    def test_dispatch_sorted(self):
+        assert self.outputs(levels.DEBUG) == ['output-a']
+        assert self.outputs(levels.INFO) == ['output-a', 'output-b']
+        assert self.outputs(levels.CRITICAL) == ['output-a', 'output-b']
+
+    def test_compiled_version(self):
+        self.emitters._compile()
+        assert self.emitters._compiled_version == self.emitters._version
+
+    def test_dict_changes_invalidate(self):
+        changes = (
+            lambda d: d.__setitem__('c', filters.Emitter(levels.DEBUG, None, 'output-c')),
+            lambda d: d.__delitem__('a'),
+            lambda d: d.pop('b'),
+            lambda d: d.popitem(),
+            lambda d: d.setdefault('d', filters.Emitter(levels.DEBUG, None, 'output-d')),
+            lambda d: d.update(e=filters.Emitter(levels.DEBUG, None, 'output-e')),
+            lambda d: d.clear(),
+        )
+        for change in changes:
+            self.emitters._compile()
+            change(self.emitters)
+            assert self.emitters._compiled_version != self.emitters._version
+
+    def test_emitter_changes_invalidate(self):
+        self.emitters._compile()
+        self.emitters['a'].min_level = levels.ERROR
+        assert self.emitters._compiled_version != self.emitters._version
+        assert self.outputs(levels.INFO) == ['output-b']
+
+        self.emitters._compile()
+        self.emitters['b'].filter = False
+        assert self.emitters._compiled_version != self.emitters._version
+
+    def test_name_dispatch(self):
+        calls = []
+
+        def is_jose(msg):
+            calls.append(msg.name)
+            return msg.name == 'jose'
+
+        self.emitters['a'].filter = filters.name_only(is_jose)
+        self.emitters['b'].filter = "^Hello"
+        selected = self.emitters._compile()[levels.INFO]
+
+        for i in range(2):
+            outputs, entries = self.emitters._name_dispatch_for(levels.INFO, selected, m)
+            assert outputs == ('output-a', )
+            assert [name for name, filt, output in entries] == ['b']
+        assert calls == ['jose']
+
+        # rebuilding the dispatch table forgets decisions
+        self.emitters['a'].filter = filters.names('frank')
+        selected = self.emitters._compile()[levels.INFO]
+        outputs, entries = self.emitters._name_dispatch_for(levels.INFO, selected, m)
+        assert outputs == ()
+
+    def test_name_dispatch_error(self):
+        def go_boom(msg):
+            raise RuntimeError("BOOM")
+        go_boom.name_only = True
+
+        self.emitters['a'].filter = go_boom
+        selected = self.emitters._compile()[levels.INFO]
+        outputs, entries = self.emitters._name_dispatch_for(levels.INFO, selected, m)
+        assert outputs == ('output-b', )
+        assert [name for name, filt, output in entries] == ['a']
@@ -1,7 +1,9 @@
-import sys
 import copy
+import json
+import sys
 
 from twiggy import formats, levels, message
+from twiggy.lib.clock import Timestamp
 
 from . import when
 
@@ -37,6 +39,11 @@ class ConversionsTestCase(unittest.TestCase):
         with self.assertRaises(ValueError):
             formats.line_format.conversion.convert(d)
 
+    def test_timestamp(self):
+        d = dict(self.fields, time=Timestamp(1288232157.25))
+        assert formats.line_format.conversion.convert(d) == \
+            '2010-10-28T02:15:57Z:INFO:mylog:pants=42'
+
     def test_shell_conversion(self):
         d = self.fields.copy()
         assert formats.shell_format.conversion.convert(d) == 'INFO:mylog:pants=42'
@@ -77,6 +84,18 @@ class FormatTestCase(unittest.TestCase):
         msg = message.Message(levels.INFO, "I wear {0}", self.fields, opts, ['pants'], {})
         assert fmt(msg) == '2010-10-28T02:15:57Z:INFO:mylog:pants=42|I wear pants\n'
 
+    def test_bytes(self):
+        fmt = formats.LineFormat(separator='|', conversion=formats.line_conversion,
+                                 encoding='utf-8')
+        assert fmt.binary
+        assert not formats.line_format.binary
+
+        opts = message.Message._default_options.copy()
+        msg = message.Message(levels.INFO, u"I wear {0}", self.fields, opts, [u'pant\xe9'], {})
+        assert fmt(msg) == (u'2010-10-28T02:15:57Z:INFO:mylog:pants=42|I wear pant\xe9\n'
+                            .encode('utf-8'))
+        assert copy.copy(fmt).encoding == 'utf-8'
+
     def test_suppress_newline_true(self):
 
         fmt = formats.LineFormat(separator='|', conversion=formats.line_conversion)
@@ -142,3 +161,146 @@ class FormatTestCase(unittest.TestCase):
         s = fmt(msg)
         lines = s.split('\n')
         assert len(lines) == 2
+
+
+class SyslogFormatTestCase(unittest.TestCase):
+
+    fields = {'time': when,
+              'level': levels.WARNING,
+              'name': 'my log',
+              'pid': 1234,
+              'pants': 42,
+              'shirt': 'size "]\\"',
+              }
+
+    def make_msg(self, fields, options=None):
+        opts = message.Message._default_options.copy()
+        opts.update(options or {})
+        return message.Message(fields.get('level', levels.INFO), "I wear {0}", fields, opts,
+                               ['pants'], {})
+
+    def test_basic(self):
+        fmt = formats.SyslogFormat(facility=16, hostname='box')
+        assert fmt.binary
+        msg = self.make_msg(self.fields)
+        assert fmt(msg) == (b'<132>1 2010-10-28T02:15:57Z box my_log 1234 - '
+                            b'[fields@32473 pants="42" shirt="size \\"\\]\\\\\\""] I wear pants')
+
+    def test_timestamp(self):
+        fmt = formats.SyslogFormat(hostname='box', app_name='app')
+        msg = self.make_msg({'level': levels.DEBUG, 'time': Timestamp(1288232157.25)})
+        assert fmt(msg) == b'<15>1 2010-10-28T02:15:57Z box app - - - I wear pants'
+
+    def test_nil(self):
+        fmt = formats.SyslogFormat(hostname='box', app_name='app')
+        msg = self.make_msg({'level': levels.DEBUG})
+        assert fmt(msg) == b'<15>1 - box app - - - I wear pants'
+
+    def test_trace(self):
+        fmt = formats.SyslogFormat(hostname='box')
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            msg = self.make_msg({'level': levels.ERROR}, {'trace': 'error'})
+        lines = fmt(msg).split(b'\n')
+        assert lines[0] == b'<11>1 - box - - - - I wear pants'
+        assert lines[1] == b'Traceback (most recent call last):'
+        assert lines[-1].startswith(b'ZeroDivisionError')
+
+
+class Thing(object):
+
+    def __str__(self):
+        return "a thing"
+
+
+class JSONFormatTestCase(unittest.TestCase):
+
+    fields = {'time': when,
+              'level': levels.WARNING,
+              'name': 'my log',
+              'pants': 42,
+              }
+
+    backends = ['json'] + (['orjson'] if formats.orjson is not None else [])
+
+    def make_msg(self, fields, options=None):
+        opts = message.Message._default_options.copy()
+        opts.update(options or {})
+        return message.Message(fields.get('level', levels.INFO), "I wear {0}", fields, opts,
+                               ['pants'], {})
+
+    def test_basic(self):
+        msg = self.make_msg(dict(self.fields))
+        for backend in self.backends:
+            fmt = formats.JSONFormat(backend=backend)
+            assert not fmt.binary
+            assert fmt(msg) == ('{"time":"2010-10-28T02:15:57.000Z","level":"WARNING",'
+                                '"name":"my log","pants":42,"message":"I wear pants"}\n'), backend
+
+    def test_values(self):
+        fields = {'timestamp': Timestamp(1288232157.25), 'float': 1.5, 'nan': float('nan'),
+                  'inf': float('inf'), 'bool': False, 'none': None, 'text': u"\u2603\"\n",
+                  'bytes': b'\xff', 'thing': Thing(), 'list': [1, (2, Thing())], 3: 'key'}
+        msg = self.make_msg(fields)
+        for backend in self.backends:
+            d = json.loads(formats.JSONFormat(backend=backend)(msg))
+            assert d == {'timestamp': '2010-10-28T02:15:57.250Z', 'float': 1.5, 'nan': None,
+                         'inf': None, 'bool': False, 'none': None, 'text': u"\u2603\"\n",
+                         'bytes': u"\ufffd", 'thing': "a thing", 'list': [1, [2, "a thing"]],
+                         '3': 'key', 'level': 'INFO', 'message': 'I wear pants'}, backend
+
+    def test_bytes(self):
+        msg = self.make_msg(dict(self.fields, text=u"\u2603"))
+        for backend in self.backends:
+            fmt = formats.JSONFormat(encoding='utf-8', backend=backend)
+            assert fmt.binary
+            line = fmt(msg)
+            assert line.endswith(b'\n')
+            assert json.loads(line.decode('utf-8'))['text'] == u"\u2603"
+            fmt = formats.JSONFormat(encoding='ascii', backend=backend)
+            assert b'"text":"\\u2603"' in fmt(msg)
+
+    def test_trace(self):
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            msg = self.make_msg(dict(self.fields), {'trace': 'error'})
+        for backend in self.backends:
+            line = formats.JSONFormat(backend=backend)(msg)
+            assert line.count('\n') == 1
+            trace = json.loads(line)['traceback']
+            assert trace.startswith('Traceback (most recent call last):')
+            assert 'ZeroDivisionError' in trace
+
+    def test_reserved_keys(self):
+        msg = self.make_msg(dict(self.fields, msg="a field", message="another"))
+        for backend in self.backends:
+            d = json.loads(formats.JSONFormat(text_key='msg', backend=backend)(msg))
+            assert d['msg'] == "I wear pants"
+            assert d['message'] == "another"
+
+    def test_default(self):
+        msg = self.make_msg(dict(self.fields, thing=Thing()))
+        for backend in self.backends:
+            fmt = formats.JSONFormat(default=lambda x: [str(x)], backend=backend)
+            assert json.loads(fmt(msg))['thing'] == ["a thing"]
+
+    @unittest.skipIf(formats.orjson is None, "requires orjson")
+    def test_orjson_fallback(self):
+        # orjson refuses lone surrogates & big ints
+        msg = self.make_msg(dict(self.fields, bad=u"\udcff", big=2 ** 70))
+        line = formats.JSONFormat(backend='orjson')(msg)
+        assert line == formats.JSONFormat(backend='json')(msg)
+        assert json.loads(line)['big'] == 2 ** 70
+
+    def test_backends(self):
+        assert formats.JSONFormat().backend == self.backends[-1]
+        with self.assertRaises(ValueError):
+            formats.JSONFormat(backend='pants')
+
+    def test_copy(self):
+        fmt = formats.JSONFormat(text_key='msg', encoding='utf-8', backend='json')
+        fmt2 = copy.copy(fmt)
+        assert fmt2 is not fmt
+        assert (fmt2.text_key, fmt2.encoding, fmt2.backend) == ('msg', 'utf-8', 'json')
@@ -90,6 +90,7 @@ def test_globals():
     assert isinstance(twiggy.log, twiggy.logger.Logger)
     assert isinstance(twiggy.emitters, dict)
     assert twiggy.emitters is twiggy.log._emitters
+    assert twiggy.log._fields['time'] is twiggy.lib.clock.now
 
     assert isinstance(twiggy.internal_log, twiggy.logger.InternalLogger)
     assert twiggy.internal_log._fields['name'] == 'twiggy.internal'
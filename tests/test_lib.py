@@ -1,5 +1,7 @@
+import os
 import sys
 import threading
+import time
 
 from twiggy import lib
 
@@ -30,3 +32,66 @@ class IsoTimeTest(unittest.TestCase):
 
     def test_iso_time(self):
         assert lib.iso8601time(when) == "2010-10-28T02:15:57Z"
+
+
+class ISO8601RendererTest(unittest.TestCase):
+
+    t = 1288232157.123456
+
+    def test_struct_time(self):
+        render = lib.ISO8601Renderer()
+        assert render(when) == lib.iso8601time(when)
+        assert render(when) == "2010-10-28T02:15:57Z"
+        assert lib.ISO8601Renderer('us')(when) == "2010-10-28T02:15:57.000000Z"
+
+    def test_precision(self):
+        assert lib.ISO8601Renderer()(self.t) == "2010-10-28T02:15:57Z"
+        assert lib.ISO8601Renderer('ms')(self.t) == "2010-10-28T02:15:57.123Z"
+        assert lib.ISO8601Renderer('us')(self.t) == "2010-10-28T02:15:57.123456Z"
+        # 0.123 isn't exactly representable
+        assert lib.ISO8601Renderer('ms')(1288232157.123) == "2010-10-28T02:15:57.123Z"
+
+    def test_cached(self):
+        render = lib.ISO8601Renderer('ms')
+        assert render(self.t) == "2010-10-28T02:15:57.123Z"
+        assert render(self.t + 0.5) == "2010-10-28T02:15:57.623Z"
+        assert render(self.t + 1) == "2010-10-28T02:15:58.123Z"
+        assert render(self.t) == "2010-10-28T02:15:57.123Z"
+        assert render(self.t + 0.876544) == "2010-10-28T02:15:58.000Z"
+
+    def test_fixed_offset(self):
+        assert lib.ISO8601Renderer(tz=19800)(self.t) == "2010-10-28T07:45:57+05:30"
+        assert lib.ISO8601Renderer('ms', tz=-18000)(self.t) == "2010-10-27T21:15:57.123-05:00"
+        assert lib.ISO8601Renderer(tz=0)(self.t) == "2010-10-28T02:15:57+00:00"
+
+    @unittest.skipIf(not hasattr(time, 'tzset'), "requires time.tzset")
+    def test_local_dst(self):
+        tz = os.environ.get('TZ')
+
+        def restore():
+            if tz is None:
+                os.environ.pop('TZ', None)
+            else:
+                os.environ['TZ'] = tz
+            time.tzset()
+        self.addCleanup(restore)
+        os.environ['TZ'] = 'GMT0BST,M3.5.0/1,M10.5.0'
+        time.tzset()
+
+        render = lib.ISO8601Renderer(tz='local')
+        # British Summer Time ended at 01:00 UTC on 2010-10-31
+        assert render(1288486799) == "2010-10-31T01:59:59+01:00"
+        assert render(1288486800) == "2010-10-31T01:00:00+00:00"
+        assert render(1288486799) == "2010-10-31T01:59:59+01:00"
+        assert render(1288490400) == "2010-10-31T02:00:00+00:00"
+
+    def test_now(self):
+        now = lib.ISO8601Renderer()()
+        assert len(now) == len("2010-10-28T02:15:57Z")
+        assert now.endswith('Z')
+
+    def test_bad(self):
+        with self.assertRaises(ValueError):
+            lib.ISO8601Renderer('ns')
+        with self.assertRaises(ValueError):
+            lib.ISO8601Renderer(tz='mars')
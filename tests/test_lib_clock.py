@@ -0,0 +1,103 @@
+import os
+import pickle
+import sys
+import time
+
+from twiggy.lib import clock
+from twiggy.lib.clock import CoarseClock, Timestamp, now
+
+from . import when
+
+if sys.version_info >= (2, 7):
+    import unittest
+else:
+    try:
+        import unittest2 as unittest
+    except ImportError:
+        raise RuntimeError("unittest2 is required for Python < 2.7")
+
+
+class TimestampTestCase(unittest.TestCase):
+
+    def test_float(self):
+        t = Timestamp(1288232157.25)
+        assert isinstance(t, float)
+        assert t == 1288232157.25
+        assert t - 0.25 == 1288232157
+        assert repr(t) == "Timestamp(1288232157.25)"
+
+    def test_struct_time(self):
+        t = Timestamp(1288232157.25)
+        assert t.struct_time == when
+        assert t.struct_time is t.struct_time
+
+    def test_pickle(self):
+        t = Timestamp(1288232157.25)
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            t2 = pickle.loads(pickle.dumps(t, protocol))
+            assert type(t2) is Timestamp
+            assert t2 == t
+
+    def test_now(self):
+        before = time.time()
+        t = now()
+        assert type(t) is Timestamp
+        assert before <= t <= time.time()
+
+
+class CoarseClockTestCase(unittest.TestCase):
+
+    def test_ticks(self):
+        c = CoarseClock(0.001)
+        self.addCleanup(c.stop)
+        before = time.time()
+        t = c()
+        assert type(t) is Timestamp
+        assert before <= t <= time.time()
+
+        deadline = time.time() + 5
+        while c() == t and time.time() < deadline:
+            time.sleep(0.001)
+        assert c() > t
+
+    def test_shared(self):
+        c = CoarseClock(60)
+        self.addCleanup(c.stop)
+        assert c() is c()
+
+    def test_stop(self):
+        c = CoarseClock(60)
+        t = c()
+        c.stop()
+        assert c._ticker is None
+        time.sleep(0.01)
+        assert c() is not t
+        c.stop()
+
+    def test_reset_after_fork(self):
+        c = CoarseClock(60)
+        self.addCleanup(c.stop)
+        t = c()
+        clock._reset_coarse_clocks()
+        assert c() is not t
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "requires fork")
+    def test_fork(self):
+        c = CoarseClock(0.001)
+        self.addCleanup(c.stop)
+        c()
+
+        r, w = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            try:
+                # the parent's ticker doesn't run here, so the time must come from a new one
+                t = c()
+                time.sleep(0.1)
+                os.write(w, str(c() > t).encode('ascii'))
+            finally:
+                os._exit(0)
+        os.close(w)
+        os.waitpid(pid, 0)
+        with os.fdopen(r, 'rb') as rf:
+            assert rf.read() == b'True'
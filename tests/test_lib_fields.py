@@ -0,0 +1,128 @@
+import os
+import sys
+import threading
+
+from twiggy.lib import fields
+from twiggy.lib.fields import FieldChain, per_process, per_thread
+
+if sys.version_info >= (2, 7):
+    import unittest
+else:
+    try:
+        import unittest2 as unittest
+    except ImportError:
+        raise RuntimeError("unittest2 is required for Python < 2.7")
+
+
+class FieldChainTestCase(unittest.TestCase):
+
+    def test_empty(self):
+        assert FieldChain().flatten() == {}
+        assert FieldChain(None, FieldChain()).flatten() == {}
+
+    def test_copies(self):
+        d = {'a': 1}
+        chain = FieldChain(d)
+        d['a'] = 2
+        assert chain.flatten() == {'a': 1}
+
+    def test_layers(self):
+        root = FieldChain({'a': 1, 'b': 1})
+        child = FieldChain({'b': 2, 'c': 2}, root)
+        grandchild = FieldChain({'c': 3}, child)
+
+        assert grandchild.parent is child
+        assert grandchild.flatten() == {'a': 1, 'b': 2, 'c': 3}
+        assert child.flatten() == {'a': 1, 'b': 2, 'c': 2}
+        assert root.flatten() == {'a': 1, 'b': 1}
+
+    def test_parent_shared(self):
+        root = FieldChain({'a': 1})
+        assert root.private() is root
+        FieldChain({'b': 2}, root)
+        assert root.shared
+        assert root.private() is not root
+
+    def test_flatten_cached(self):
+        root = FieldChain({'a': 1})
+        child = FieldChain({'b': 2}, root)
+
+        flat = child.flatten()
+        assert child.flatten() is flat
+        # intermediate layers aren't flattened
+        assert root._flat is None
+
+    def test_flatten_from_cached_parent(self):
+        root = FieldChain({'a': 1})
+        root.flatten()['a'] = 42
+        child = FieldChain({'b': 2}, root)
+        assert child.flatten() == {'a': 42, 'b': 2}
+
+    def test_deep(self):
+        chain = FieldChain()
+        for i in range(1000):
+            chain = FieldChain({'x': i, str(i): i}, chain)
+        flat = chain.flatten()
+        assert len(flat) == 1001
+        assert flat['x'] == 999
+
+
+class Counter(object):
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.calls
+
+
+class PerProcessTestCase(unittest.TestCase):
+
+    def test_cached(self):
+        counter = Counter()
+        f = per_process(counter)
+        assert f() == 1
+        assert f() == 1
+        assert counter.calls == 1
+
+    def test_reset_after_fork(self):
+        counter = Counter()
+        f = per_process(counter)
+        assert f() == 1
+        fields._reset_per_process()
+        assert f() == 2
+        assert f() == 2
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "requires fork")
+    def test_fork(self):
+        f = per_process(os.getpid)
+        assert f() == os.getpid()
+
+        r, w = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            try:
+                os.write(w, str(f() == os.getpid()).encode('ascii'))
+            finally:
+                os._exit(0)
+        os.close(w)
+        os.waitpid(pid, 0)
+        with os.fdopen(r, 'rb') as rf:
+            assert rf.read() == b'True'
+
+
+class PerThreadTestCase(unittest.TestCase):
+
+    def test_cached_per_thread(self):
+        counter = Counter()
+        f = per_thread(counter)
+        assert f() == 1
+        assert f() == 1
+
+        results = []
+        t = threading.Thread(target=lambda: results.extend([f(), f()]))
+        t.start()
+        t.join()
+        assert results == [2, 2]
+        assert f() == 1
@@ -0,0 +1,104 @@
+import multiprocessing
+import sys
+
+from twiggy.lib import ring
+
+if sys.version_info >= (2, 7):
+    import unittest
+else:
+    try:
+        import unittest2 as unittest
+    except ImportError:
+        raise RuntimeError("unittest2 is required for Python < 2.7")
+
+
+def _read_all(r, results):
+    received = []
+    while r.wait():
+        received.append(r.get())
+    results.put(received)
+    r.close()
+
+
+@unittest.skipIf(ring.shared_memory is None, "requires multiprocessing.shared_memory")
+class SharedRingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.ring = ring.SharedRing(64)
+
+    def tearDown(self):
+        self.ring.close()
+
+    def test_put_get(self):
+        assert self.ring.get() is None
+        assert self.ring.put(b'hello')
+        assert self.ring.put(b'')
+        assert len(self.ring) == 4 + 5 + 4
+        assert self.ring.get() == b'hello'
+        assert self.ring.get() == b''
+        assert self.ring.get() is None
+        assert len(self.ring) == 0
+
+    def test_full(self):
+        assert self.ring.put(b'x' * 30)
+        assert self.ring.put(b'x' * 26)
+        assert not self.ring.put(b'')
+        assert self.ring.get() == b'x' * 30
+        assert self.ring.put(b'y' * 20)
+
+    def test_too_big(self):
+        with self.assertRaises(ValueError):
+            self.ring.put(b'x' * 61)
+
+    def test_wraps(self):
+        for i in range(100):
+            record = str(i).encode('ascii') * (i % 7)
+            assert self.ring.put(record)
+            assert self.ring.get() == record
+
+    def test_attach(self):
+        other = ring.SharedRing(64, self.ring.name)
+        self.addCleanup(other.close)
+        self.ring.put(b'hello')
+        assert other.get() == b'hello'
+
+    def test_wait(self):
+        assert not self.ring.wait(0.01)
+        self.ring.put(b'hello')
+        assert self.ring.wait(0.01)
+        self.ring.get()
+        self.ring.close_writer()
+        assert self.ring.writer_closed
+        assert not self.ring.wait()
+
+    def test_wait_closed_race(self):
+        # the writer puts a record & closes between the reader checking the head & whether
+        # it's closed
+        class RacingRing(ring.SharedRing):
+            raced = False
+
+            @property
+            def writer_closed(self):
+                if not self.raced:
+                    self.raced = True
+                    assert self.put(b'late')
+                    self.close_writer()
+                return ring.SharedRing.writer_closed.fget(self)
+
+        r = RacingRing(64)
+        self.addCleanup(r.close)
+        assert r.wait()
+        assert r.get() == b'late'
+        assert not r.wait()
+
+    def test_other_process(self):
+        results = multiprocessing.Queue()
+        reader = multiprocessing.Process(target=_read_all, args=(self.ring, results))
+        reader.start()
+        records = [str(i).encode('ascii') for i in range(2000)]
+        for record in records:
+            while not self.ring.put(record):
+                pass
+        self.ring.close_writer()
+        assert results.get(timeout=30) == records
+        reader.join()
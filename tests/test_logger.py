@@ -86,6 +86,18 @@ class TestOptions(object):
         with pytest.raises(ValueError):
             test_logger.options(boom=True)
 
+    @pytest.mark.parametrize('options', ({'style': 'badstyle'}, {'trace': 'badtrace'}))
+    def test_bad_option_values(self, test_logger, options):
+        with pytest.raises(ValueError):
+            test_logger.options(**options)
+
+    def test_options_immutable(self, test_logger):
+        log = test_logger.options(style='%')
+        assert log._options.style == 'percent'
+        assert test_logger._options.style == 'braces'
+        with pytest.raises(AttributeError):
+            log._options.style = 'dollar'
+
     def test_trace(self, test_logger):
         log = test_logger.trace('error')
         assert log is not test_logger
@@ -176,8 +188,8 @@ class InternalLoggerTest(unittest.TestCase):
         assert log._fields == self.log._fields
         assert log._fields is not self.log._fields
 
-        assert log._options == self.log._options
-        assert log._options is not self.log._options
+        # options are immutable, so are shared
+        assert log._options is self.log._options
 
         assert log.min_level == self.log.min_level
 
@@ -277,6 +289,236 @@ class LoggerTestCase(unittest.TestCase):
         self.log.debug('hi')
         assert len(self.messages) == 0
 
+    def test_name_filter_emitters(self):
+        calls = []
+
+        def is_foo(msg):
+            calls.append(msg.name)
+            return msg.name == 'foo'
+
+        self.emitters['*'].filter = filters.name_only(is_foo)
+        for i in range(3):
+            self.log.name('foo').debug('hi')
+            self.log.name('bar').debug('hi')
+        assert len(self.messages) == 3
+        assert all(m.name == 'foo' for m in self.messages)
+        assert sorted(calls) == ['bar', 'foo']
+
+    def test_format_shared(self):
+        calls = []
+
+        def counting_format(msg):
+            calls.append(msg)
+            return msg.text
+
+        def other_format(msg):
+            calls.append(msg)
+            return msg.text.upper()
+
+        self.emitters.clear()
+        outs = [outputs.ListOutput(format=f, close_atexit=False)
+                for f in (counting_format, counting_format, other_format)]
+        for i, o in enumerate(outs):
+            self.addCleanup(o.close)
+            self.emitters[i] = filters.Emitter(levels.DEBUG, None, o)
+
+        self.log.debug('hi')
+        assert len(calls) == 2
+        assert [o.messages for o in outs] == [['hi'], ['hi'], ['HI']]
+
+        # no need to keep results for a single output
+        del self.emitters[1], self.emitters[2]
+        self.log.debug('hi')
+        assert len(calls) == 3
+        assert calls[-1]._formats is None
+
+    def test_emitters_changed(self):
+        self.log.debug('hi')
+        assert len(self.messages) == 1
+        self.messages.pop()
+
+        self.emitters['*'].min_level = levels.INFO
+        self.log.debug('hi')
+        assert len(self.messages) == 0
+
+        output = outputs.ListOutput(close_atexit=False)
+        self.addCleanup(output.close)
+        self.emitters['debug'] = filters.Emitter(levels.DEBUG, None, output)
+        self.log.debug('hi')
+        assert len(self.messages) == 0
+        assert len(output.messages) == 1
+
+    def test_emitters_min_level_short_circuit(self):
+        filtered = []
+
+        def record_filter(fmt_spec):
+            filtered.append(fmt_spec)
+            return True
+
+        self.log.filter = record_filter
+        self.emitters['*'].min_level = levels.INFO
+        self.log.info('compile')
+        assert self.emitters._min_value == levels.INFO._value
+
+        self.log.debug('hi')
+        assert filtered == ['compile']
+
+        output = outputs.ListOutput(close_atexit=False)
+        self.addCleanup(output.close)
+        self.emitters['debug'] = filters.Emitter(levels.DEBUG, None, output)
+        self.log.debug('hi')
+        assert filtered == ['compile', 'hi']
+        assert len(output.messages) == 1
+        assert self.emitters._min_value == levels.DEBUG._value
+
+    def test_no_emitters_short_circuit(self):
+        self.emitters.clear()
+        self.log.critical('hi')
+        self.log.filter = None  # would blow up if called
+        self.log.critical('hi')
+        assert len(self.messages) == 0
+
+    def test_disabled_methods(self):
+        self.emitters['*'].min_level = levels.INFO
+        self.log.info('compile')
+        self.messages.pop()
+
+        assert isinstance(self.log, logger.Logger)
+        assert self.log.debug is logger._disabled
+        assert self.log.info is not logger._disabled
+
+        output = outputs.ListOutput(close_atexit=False)
+        self.addCleanup(output.close)
+        self.emitters['debug'] = filters.Emitter(levels.DEBUG, None, output)
+        assert self.log.debug is not logger._disabled
+        self.log.debug('hi')
+        assert len(output.messages) == 1
+        assert self.log.debug is not logger._disabled
+
+    def test_disabled_notice(self):
+        assert self.log.notice('hi') is True
+        self.emitters['*'].min_level = levels.WARNING
+        self.log.warning('compile')
+        assert self.log.notice is logger._disabled_notice
+        assert self.log.notice('hi') is True
+
+    def test_disabled_methods_min_level(self):
+        log = self.log.name('min_level')
+        log.min_level = levels.WARNING
+        assert log.info is logger._disabled
+        assert log.warning is not logger._disabled
+        assert self.log.info is not logger._disabled
+
+        clone = log.name('clone')
+        assert clone.info is logger._disabled
+        assert type(clone) is type(log)
+
+        log.min_level = levels.DEBUG
+        assert log.info is not logger._disabled
+        log.info('hi')
+        assert len(self.messages) == 1
+
+    def test_features_on_specialized(self):
+        def feature(self):
+            return self.name('feature')
+
+        with pytest.warns(RuntimeWarning):
+            self.log.addFeature(feature)
+        self.addCleanup(delattr, logger.Logger, 'feature')
+        assert 'feature' in logger.Logger.__dict__
+        assert self.log.feature()._fields['name'] == 'feature'
+
+    def test_name_cached(self):
+        self.log.name('first')
+        child = self.log.name('child')
+        again = self.log.name('child')
+        # fields are shared, loggers aren't
+        assert again is not child
+        assert again._field_chain.parent is child._field_chain.parent
+        assert self.log.name('other')._fields['name'] == 'other'
+        assert again._fields['name'] == 'child'
+
+    def test_name_not_cached_once(self):
+        child = self.log.fields(request_id=42)
+        child.name('handler')
+        assert child._name_chains == {}
+
+    def test_name_cached_independent(self):
+        self.log.name('first')
+        child = self.log.name('child')
+        child.min_level = levels.ERROR
+        child.filter = lambda fmt_spec: False
+        child._fields['extra'] = 42
+
+        again = self.log.name('child')
+        assert again.min_level == levels.DEBUG
+        assert 'extra' not in again._fields
+        again.info('hi')
+        assert len(self.messages) == 1
+        assert 'extra' not in self.messages[0].fields
+
+    def test_name_cache_parent_fields_changed(self):
+        self.log._fields['time'] = 0
+        self.log.name('first')
+        self.log.name('svc').info('hi')
+        self.log._fields['time'] = 'patched'
+        self.log.name('svc').info('hi')
+        assert self.messages[-1].fields['time'] == 'patched'
+
+    def test_parent_fields_changed(self):
+        child = self.log.fields(a=1)
+        self.log._fields['b'] = 2
+        assert 'b' not in child._fields
+
+        child = self.log.fields(a=1)
+        child._fields
+        self.log._fields['c'] = 3
+        assert 'c' not in child._fields
+
+        # but loggers cloned afterwards get them
+        assert self.log.fields(a=1)._fields == {'a': 1, 'b': 2, 'c': 3}
+
+    def test_name_unhashable(self):
+        self.log.name('first')
+        child = self.log.name(['child'])
+        assert child._fields['name'] == ['child']
+
+    def test_fields_not_cached(self):
+        child = self.log.fields(a=1, b='b')
+        assert self.log.fields(a=1, b='b') is not child
+        assert not self.log._name_chains
+
+    def test_name_cache_follows_parent(self):
+        self.log.name('first')
+        self.log.name('child')
+
+        def f(fmt_spec):
+            return True
+        self.log.filter = f
+        assert self.log.name('child').filter is f
+
+        self.log.min_level = levels.INFO
+        assert self.log.name('child').min_level == levels.INFO
+        assert self.log.name('child').debug is logger._disabled
+
+    def test_child_cache_bounded(self):
+        for i in range(logger.Logger.child_cache_size * 2):
+            self.log.name(i)
+        assert len(self.log._name_chains) == logger.Logger.child_cache_size
+
+    def test_plain_dict_emitters(self):
+        em = {'*': self.emitters['*']}
+        with pytest.warns(RuntimeWarning):
+            log = logger.Logger(emitters=em)
+        assert isinstance(log._emitters, filters.EmitterDict)
+        log.debug('hi')
+        assert len(self.messages) == 1
+
+        # it's a copy
+        em.clear()
+        log.debug('hi')
+        assert len(self.messages) == 2
+
     def test_logger_filter(self):
         self.log.filter = lambda fmt_spec: 'pants' in fmt_spec
         self.log.debug('hi')
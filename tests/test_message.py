@@ -1,7 +1,12 @@
+import marshal
+import pickle
 import sys
+import time
 
 import twiggy.levels
-from twiggy.message import Message
+from twiggy import logger, outputs
+from twiggy.lib.clock import Timestamp
+from twiggy.message import Message, Options, RendererCache
 
 from . import make_mesg
 
@@ -319,3 +324,213 @@ and shirt'''
 
         assert m.traceback.startswith('Traceback (most recent call last):')
         assert 'ZeroDivisionError:' in m.traceback
+
+    def test_lazy_text(self):
+        class Shirt(object):
+            formatted = 0
+
+            def __format__(self, spec):
+                self.formatted += 1
+                return 'shirt'
+
+        shirt = Shirt()
+        m = Message(twiggy.levels.DEBUG,
+                    "Hello {0}",
+                    {},
+                    Message._default_options,
+                    args=[shirt],
+                    kwargs={},
+                    )
+
+        assert shirt.formatted == 0
+        assert m.text == "Hello shirt"
+        assert m.text == "Hello shirt"
+        assert shirt.formatted == 1
+
+    def test_lazy_text_error(self):
+        internal_output = outputs.ListOutput(close_atexit=False)
+        self.addCleanup(internal_output.close)
+        self.addCleanup(setattr, logger.internal_log, 'output', logger.internal_log.output)
+        logger.internal_log.output = internal_output
+
+        m = Message(twiggy.levels.DEBUG,
+                    "Hello {0} {who}",
+                    {},
+                    Message._default_options,
+                    args=["Mister"],
+                    kwargs={},
+                    )
+        assert len(internal_output.messages) == 0
+
+        assert m.text == "Hello {0} {who}"
+        assert len(internal_output.messages) == 1
+        im = internal_output.messages.pop()
+        assert "Error formatting message text" in im.text
+        assert "KeyError" in im.traceback
+
+    def test_pickle(self):
+        m = make_mesg()
+        m2 = pickle.loads(pickle.dumps(m))
+        assert m2.fields == m.fields
+        assert m2.text == "Hello Mister Funnypants"
+        assert m2.suppress_newlines == m.suppress_newlines
+        assert m2.traceback == m.traceback
+
+
+class EncodeTestCase(unittest.TestCase):
+
+    def round_trip(self, m):
+        data = m.encode()
+        assert isinstance(data, bytes)
+        m2 = Message.decode(data)
+        assert m2.text == m.text
+        assert m2.suppress_newlines == m.suppress_newlines
+        assert m2.traceback == m.traceback
+        return m2
+
+    def test_round_trip(self):
+        m = make_mesg()
+        m2 = self.round_trip(m)
+        assert m2.fields == m.fields
+        assert m2.level is twiggy.levels.DEBUG
+        assert m2.name == 'jose'
+
+    def test_values(self):
+        class Thing(object):
+            def __str__(self):
+                return "a thing"
+
+        fields = {'int': 42, 'big': 2 ** 70, 'float': 4.2, 'none': None, 'bool': True,
+                  'text': u"\u2603", 'bytes': b'\xff', 'level': twiggy.levels.ERROR,
+                  'gmtime': time.gmtime(1234567890), 'localtime': time.localtime(1234567890),
+                  'struct_time': time.struct_time((2010, 10, 28, 2, 15, 57, 3, 301, 0)),
+                  'timestamp': Timestamp(1288232157.25), 'thing': Thing(), 'list': [1, 2],
+                  0: 'zero', 1: 'one', 42: 42, (1, ): 'tuple'}
+        m = Message(twiggy.levels.ERROR, "hi", dict(fields), {'suppress_newlines': False},
+                    (), {})
+        m2 = self.round_trip(m)
+
+        for k in ('int', 'big', 'float', 'none', 'bool', 'text', 'bytes', 'gmtime',
+                  'localtime', 'struct_time', 'timestamp', 0, 1, 42, (1, )):
+            assert m2.fields[k] == fields[k], k
+            assert type(m2.fields[k]) is type(fields[k]), k
+        assert m2.fields['level'] is twiggy.levels.ERROR
+        assert m2.fields['thing'] == "a thing"
+        assert m2.fields['list'] == "[1, 2]"
+
+    def test_traceback(self):
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            m = Message(twiggy.levels.ERROR, "oops", {}, {'trace': 'error'}, (), {})
+        assert m.traceback
+        self.round_trip(m)
+
+    def test_smaller_than_pickle(self):
+        m = make_mesg()
+        m.fields['time'] = time.gmtime()
+        assert len(m.encode()) < len(pickle.dumps(m, pickle.HIGHEST_PROTOCOL)) / 2
+
+    def test_bad_version(self):
+        data = marshal.dumps((0, u"hi", None, True, ()))
+        with self.assertRaises(ValueError):
+            Message.decode(data)
+
+
+class OptionsTestCase(unittest.TestCase):
+
+    def test_defaults(self):
+        opts = Options()
+        assert opts.as_dict() == Message._default_options
+        assert opts == Options.coerce(Message._default_options)
+
+    def test_coerce(self):
+        opts = Options()
+        assert Options.coerce(opts) is opts
+        assert Options.coerce({'style': '$'}).style == 'dollar'
+
+    def test_getitem(self):
+        opts = Options(style='%')
+        assert opts['style'] == 'percent'
+        assert opts['suppress_newlines'] is True
+        with self.assertRaises(KeyError):
+            opts['_render']
+
+    def test_immutable(self):
+        opts = Options()
+        with self.assertRaises(AttributeError):
+            opts.style = 'dollar'
+
+    def test_replace(self):
+        opts = Options()
+        opts2 = opts.replace(style='dollar')
+        assert opts.style == 'braces'
+        assert opts2.style == 'dollar'
+        assert opts2.suppress_newlines is True
+
+    def test_bad(self):
+        with self.assertRaises(ValueError):
+            Options(style='badstyle')
+        with self.assertRaises(ValueError):
+            Options(trace='badtrace')
+        with self.assertRaises(NotImplementedError):
+            Options(trace='always')
+
+    def test_trace_tuple(self):
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            opts = Options(trace=sys.exc_info())
+
+        m = Message(twiggy.levels.DEBUG, "Hello", {}, opts, args=[], kwargs={})
+        assert m.traceback is opts._traceback
+        assert 'ZeroDivisionError:' in m.traceback
+
+    def test_pickle(self):
+        opts = Options(style='$', suppress_newlines=False)
+        assert pickle.loads(pickle.dumps(opts)) == opts
+
+
+class RendererCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = RendererCache(maxsize=2)
+
+    def test_styles(self):
+        assert self.cache.get('dollar', 'Hello $who')(who="Funnypants") == "Hello Funnypants"
+        assert self.cache.get('dollar', 'Hello $$ ${who}s')(who="Funnypant") \
+            == "Hello $ Funnypants"
+        assert self.cache.get('dollar', 'Hello')() == "Hello"
+
+    def test_uncached_styles(self):
+        for style in ('braces', 'percent'):
+            with self.assertRaises(KeyError):
+                self.cache.get(style, 'Hello')
+
+    def test_errors_when_rendering(self):
+        render = self.cache.get('dollar', 'Hello $who')
+        with self.assertRaises(KeyError):
+            render()
+
+        render = self.cache.get('dollar', 'Hello $')
+        with self.assertRaises(ValueError):
+            render()
+
+    def test_stats(self):
+        render = self.cache.get('dollar', 'Hello $who')
+        assert self.cache.get('dollar', 'Hello $who') is render
+        assert self.cache.get('dollar', 'Hello ${who}') is not render
+
+        assert self.cache.info() == {'hits': 1, 'misses': 2, 'hit_rate': 1.0 / 3,
+                                     'size': 2, 'maxsize': 2}
+        self.cache.clear()
+        assert self.cache.info() == {'hits': 0, 'misses': 0, 'hit_rate': 0.0,
+                                     'size': 0, 'maxsize': 2}
+
+    def test_bounded(self):
+        first = self.cache.get('dollar', 'first')
+        self.cache.get('dollar', 'second')
+        assert self.cache.get('dollar', 'first') is first
+        self.cache.get('dollar', 'third')
+        assert self.cache.info()['size'] == 2
+        assert self.cache.get('dollar', 'first') is not first
@@ -1,10 +1,19 @@
+import gzip
 import os
+import shutil
+import signal
+import socket
+import subprocess
 import sys
 import tempfile
+import threading
+import time
 
 from six import StringIO
 
-from twiggy import outputs, formats
+from twiggy import levels, logger, outputs, formats
+from twiggy.lib import ring
+from twiggy.message import Message
 
 from . import make_mesg, when
 
@@ -23,6 +32,20 @@ m = make_mesg()
 m.fields['time'] = when
 
 
+def numbered(i, level=levels.DEBUG):
+    return Message(level, "{0}", {'name': 'jose', 'time': when}, Message._default_options,
+                   args=[i], kwargs={})
+
+
+def capture_internal_log(test):
+    """send `.internal_log` to a list for the rest of ``test``, and return it"""
+    internal_output = outputs.ListOutput(close_atexit=False)
+    test.addCleanup(internal_output.close)
+    test.addCleanup(setattr, logger.internal_log, 'output', logger.internal_log.output)
+    logger.internal_log.output = internal_output
+    return internal_output.messages
+
+
 # XXX I can't think of a decent way to test Output/AsyncOutput on their own...
 class UnlockedFileOutput(outputs.FileOutput):
 
@@ -42,11 +65,11 @@ class FileOutputTestCase(unittest.TestCase):
 
         del self.fname
 
-    def make_output(self, msg_buffer, locked):
+    def make_output(self, msg_buffer, locked, async_mode='process'):
         cls = outputs.FileOutput if locked else UnlockedFileOutput
 
         return cls(name=self.fname, format=formats.shell_format, buffering=1,
-                   msg_buffer=msg_buffer, close_atexit=False)
+                   msg_buffer=msg_buffer, close_atexit=False, async_mode=async_mode)
 
     def test_sync(self):
         o = self.make_output(0, True)
@@ -76,6 +99,699 @@ class FileOutputTestCase(unittest.TestCase):
         s = open(self.fname, 'r').read()
         assert s == "DEBUG:jose:shirt=42|Hello Mister Funnypants\n"
 
+    def test_async_thread(self):
+        o = self.make_output(-1, True, 'thread')
+        o.output(m)
+        o.close()
+        s = open(self.fname, 'r').read()
+        assert s == "DEBUG:jose:shirt=42|Hello Mister Funnypants\n"
+
+    def test_async_thread_unlocked(self):
+        o = self.make_output(-1, False, 'thread')
+        o.output(m)
+        o.close()
+        s = open(self.fname, 'r').read()
+        assert s == "DEBUG:jose:shirt=42|Hello Mister Funnypants\n"
+
+    def test_async_text_substituted_when_logged(self):
+        for async_mode in ('process', 'thread'):
+            o = self.make_output(-1, True, async_mode)
+            lst = [1]
+            msg = Message(levels.DEBUG, "list is {0}", {'time': when}, Message._default_options,
+                          [lst], {})
+            o.output(msg)
+            lst.append(2)
+            o.close()
+            assert open(self.fname, 'r').read() == "DEBUG|list is [1]\n"
+            os.remove(self.fname)
+
+    def test_async_thread_daemon(self):
+        # or the interpreter would wait for it before calling close() at exit
+        script = ("from twiggy import formats, outputs\n"
+                  "o = outputs.FileOutput({0!r}, formats.shell_format, msg_buffer=10,"
+                  " async_mode='thread')\n".format(self.fname))
+        proc = subprocess.Popen([sys.executable, '-c', script])
+        deadline = time.time() + 30
+        while proc.poll() is None and time.time() < deadline:
+            time.sleep(0.05)
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+            self.fail("interpreter didn't exit")
+        assert proc.returncode == 0
+
+    def test_async_thread_producers(self):
+        o = self.make_output(-1, True, 'thread')
+
+        def produce():
+            for i in range(500):
+                o.output(m)
+        threads = [threading.Thread(target=produce) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        o.close()
+        lines = open(self.fname, 'r').read().splitlines()
+        assert len(lines) == 2000
+        assert set(lines) == set(["DEBUG:jose:shirt=42|Hello Mister Funnypants"])
+
+    def block_writer(self, o):
+        """keep the writer of ``o`` busy once it has a batch, so messages back up
+
+        :returns: an event to set to release the writer
+        """
+        writing, release = threading.Event(), threading.Event()
+        write_batch = o._write_batch
+
+        def blocked_write_batch(xs):
+            writing.set()
+            release.wait()
+            write_batch(xs)
+        o._write_batch = blocked_write_batch
+
+        o.output(numbered(0))
+        writing.wait()
+        return release
+
+    def make_overflow_output(self, **kwargs):
+        return outputs.FileOutput(name=self.fname, format=formats.shell_format, msg_buffer=1,
+                                  close_atexit=False, async_mode='thread', **kwargs)
+
+    def written(self):
+        return [line.split('|')[-1] for line in open(self.fname, 'r').read().splitlines()]
+
+    def test_async_thread_full(self):
+        internal = capture_internal_log(self)
+        o = self.make_overflow_output()
+        release = self.block_writer(o)
+        o.output(numbered(1))
+        o.output(numbered(2))
+        assert o.dropped == 1
+        assert len(internal) == 1
+        release.set()
+        o.close()
+        assert self.written() == ['0', '1']
+
+    def test_overflow_drop_oldest(self):
+        o = self.make_overflow_output(overflow='drop_oldest')
+        release = self.block_writer(o)
+        o.output(numbered(1))
+        o.output(numbered(2))
+        assert o.dropped == 1
+        release.set()
+        o.close()
+        assert self.written() == ['0', '2']
+
+    def test_overflow_block(self):
+        o = self.make_overflow_output(overflow='block')
+        release = self.block_writer(o)
+        o.output(numbered(1))
+        timer = threading.Timer(0.05, release.set)
+        timer.start()
+        o.output(numbered(2))
+        assert release.is_set()
+        timer.join()
+        o.close()
+        assert o.dropped == 0
+        assert self.written() == ['0', '1', '2']
+
+    def test_overflow_block_timeout(self):
+        o = self.make_overflow_output(overflow='block', overflow_timeout=0.05)
+        release = self.block_writer(o)
+        o.output(numbered(1))
+        start = time.time()
+        o.output(numbered(2))
+        assert time.time() - start >= 0.05
+        assert o.dropped == 1
+        release.set()
+        o.close()
+        assert self.written() == ['0', '1']
+
+    def test_overflow_drop_below(self):
+        o = self.make_overflow_output(overflow='drop_below', overflow_level=levels.WARNING)
+        release = self.block_writer(o)
+        o.output(numbered(1))
+        o.output(numbered(2))
+        assert o.dropped == 1
+        timer = threading.Timer(0.05, release.set)
+        timer.start()
+        o.output(numbered(3, levels.WARNING))
+        assert release.is_set()
+        timer.join()
+        o.close()
+        assert self.written() == ['0', '1', '3']
+
+    def test_overflow_reported_once(self):
+        internal = capture_internal_log(self)
+        o = self.make_overflow_output()
+        release = self.block_writer(o)
+        for i in range(1, 101):
+            o.output(numbered(i))
+        assert o.dropped == 99
+        # the first drop is reported right away; the rest wait for the interval or close
+        assert len(internal) == 1
+        release.set()
+        o.close()
+        assert len(internal) == 2
+        assert "dropped 98 messages" in internal[1].text
+        assert "99 in all" in internal[1].text
+
+    def test_bad_overflow(self):
+        with self.assertRaises(ValueError):
+            self.make_overflow_output(overflow='spill')
+        with self.assertRaises(ValueError):
+            self.make_overflow_output(overflow='drop_below')
+        with self.assertRaises(ValueError):
+            outputs.FileOutput(name=self.fname, format=formats.shell_format, msg_buffer=1,
+                               close_atexit=False, async_mode='shared_memory',
+                               overflow='drop_oldest')
+
+    def test_async_batches(self):
+        for async_mode in ('process', 'thread'):
+            o = self.make_output(-1, True, async_mode)
+            for i in range(100):
+                o.output(m)
+            o.close()
+            lines = open(self.fname, 'r').read().splitlines()
+            assert len(lines) == 100
+            assert set(lines) == set(["DEBUG:jose:shirt=42|Hello Mister Funnypants"])
+            os.remove(self.fname)
+
+    def test_async_thread_batch_size(self):
+        o = outputs.FileOutput(name=self.fname, format=formats.shell_format, msg_buffer=-1,
+                               close_atexit=False, async_mode='thread', batch_size=3,
+                               linger=0.5)
+        batches = []
+        write_batch = o._write_batch
+
+        def recording_write_batch(xs):
+            batches.append(len(xs))
+            write_batch(xs)
+        o._write_batch = recording_write_batch
+
+        for i in range(7):
+            o.output(m)
+        o.close()
+        # lingering fills each batch, until shutdown
+        assert batches == [3, 3, 1]
+        assert len(open(self.fname, 'r').read().splitlines()) == 7
+
+    def test_bad_batch_size(self):
+        with self.assertRaises(ValueError):
+            outputs.FileOutput(name=self.fname, format=formats.shell_format, msg_buffer=-1,
+                               close_atexit=False, batch_size=0)
+
+    @unittest.skipIf(ring.shared_memory is None, "requires multiprocessing.shared_memory")
+    def test_async_shared_memory(self):
+        o = self.make_output(-1, True, 'shared_memory')
+        for i in range(100):
+            o.output(m)
+        o.close()
+        lines = open(self.fname, 'r').read().splitlines()
+        assert len(lines) == 100
+        assert set(lines) == set(["DEBUG:jose:shirt=42|Hello Mister Funnypants"])
+
+    @unittest.skipIf(ring.shared_memory is None, "requires multiprocessing.shared_memory")
+    def test_async_shared_memory_full(self):
+        class SmallRingOutput(outputs.FileOutput):
+            ring_size = 256
+
+        capture_internal_log(self)
+        o = SmallRingOutput(name=self.fname, format=formats.shell_format, msg_buffer=-1,
+                            close_atexit=False, async_mode='shared_memory')
+        for i in range(100):
+            o.output(m)
+        o.close()
+        assert o.dropped > 0
+        assert len(open(self.fname, 'r').read().splitlines()) == 100 - o.dropped
+
+    def test_bad_async_mode(self):
+        with self.assertRaises(ValueError):
+            self.make_output(-1, True, 'fibre')
+
+
+class FlushPolicyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.fname = tempfile.mktemp()
+
+    def tearDown(self):
+        try:
+            os.remove(self.fname)
+        except Exception:
+            pass
+
+    def make_output(self, msg_buffer=0, **kwargs):
+        o = outputs.FileOutput(name=self.fname, format=formats.shell_format, buffering=1 << 16,
+                               msg_buffer=msg_buffer, close_atexit=False, **kwargs)
+        self.addCleanup(o.close)
+        return o
+
+    def written(self):
+        return len(open(self.fname, 'r').read().splitlines())
+
+    def test_block_buffered(self):
+        o = self.make_output()
+        o.output(numbered(1, levels.ERROR))
+        assert self.written() == 0
+
+    def test_flush_level(self):
+        o = self.make_output(flush_level=levels.ERROR)
+        o.output(numbered(1))
+        o.output(numbered(2, levels.WARNING))
+        assert self.written() == 0
+        o.output(numbered(3, levels.ERROR))
+        assert self.written() == 3
+
+    def test_flush_level_batch(self):
+        o = self.make_output(msg_buffer=-1, async_mode='thread', flush_level=levels.ERROR)
+        o.output(numbered(1))
+        o.output(numbered(2, levels.CRITICAL))
+        deadline = time.time() + 5
+        while self.written() < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert self.written() == 2
+
+    def test_flush_bytes(self):
+        line = formats.shell_format(numbered(1))
+        o = self.make_output(flush_bytes=len(line) * 3)
+        o.output(numbered(1))
+        o.output(numbered(2))
+        assert self.written() == 0
+        o.output(numbered(3))
+        assert self.written() == 3
+        o.output(numbered(4))
+        assert self.written() == 3
+
+    def test_flush_interval(self):
+        o = self.make_output(flush_interval=0.01)
+        o.output(numbered(1))
+        deadline = time.time() + 5
+        while self.written() < 1 and time.time() < deadline:
+            time.sleep(0.01)
+        assert self.written() == 1
+        o.close()
+        assert not o._flusher.is_alive()
+
+
+class RawFileOutputTest(unittest.TestCase):
+
+    def setUp(self):
+        self.fname = tempfile.mktemp()
+        self.bytes_format = formats.LineFormat(conversion=formats.shell_format.conversion,
+                                               encoding='utf-8')
+
+    def tearDown(self):
+        try:
+            os.remove(self.fname)
+        except Exception:
+            pass
+
+    def written(self):
+        with open(self.fname, 'rb') as f:
+            return f.read().decode('utf-8').splitlines()
+
+    def test_bytes_format(self):
+        for msg_buffer, async_mode in ((0, 'process'), (-1, 'process'), (-1, 'thread')):
+            o = outputs.FileOutput(self.fname, self.bytes_format, msg_buffer=msg_buffer,
+                                   close_atexit=False, async_mode=async_mode)
+            assert o.raw
+            for i in range(10):
+                o.output(numbered(i))
+            o.close()
+            assert [line.split('|')[-1] for line in self.written()] == [
+                str(i) for i in range(10)]
+            os.remove(self.fname)
+
+    def test_raw_text(self):
+        o = outputs.FileOutput(self.fname, formats.shell_format, raw=True, close_atexit=False)
+        assert isinstance(o.file, outputs._RawFile)
+        o.output(m)
+        o._write_batch([u'caf\xe9\n', u'bar\n'])
+        o.close()
+        assert self.written() == ["DEBUG:jose:shirt=42|Hello Mister Funnypants",
+                                  u'caf\xe9', 'bar']
+
+    def test_raw_append(self):
+        for mode in ('a', 'a', 'w'):
+            o = outputs.FileOutput(self.fname, formats.shell_format, mode=mode, raw=True,
+                                   close_atexit=False)
+            o.output(m)
+            o.close()
+        assert len(self.written()) == 1
+
+    def test_stream_fd(self):
+        with open(self.fname, 'w') as stream:
+            stream.write('first\n')
+            o = outputs.StreamOutput(self.bytes_format, stream)
+            assert o._fd == stream.fileno()
+            o.output(m)
+            o._write_batch([])
+        assert self.written() == ['first', "DEBUG:jose:shirt=42|Hello Mister Funnypants"]
+
+    def test_stream_fd_interleaved(self):
+        with open(self.fname, 'w') as stream:
+            o = outputs.StreamOutput(self.bytes_format, stream)
+            for i in range(3):
+                stream.write('printed {0}\n'.format(i))
+                o.output(m)
+        assert self.written() == ['printed 0', "DEBUG:jose:shirt=42|Hello Mister Funnypants",
+                                  'printed 1', "DEBUG:jose:shirt=42|Hello Mister Funnypants",
+                                  'printed 2', "DEBUG:jose:shirt=42|Hello Mister Funnypants"]
+
+    def test_stream_no_fd(self):
+        sio = StringIO()
+        o = outputs.StreamOutput(self.bytes_format, sio)
+        assert o._fd is None
+        o.output(m)
+        assert sio.getvalue() == "DEBUG:jose:shirt=42|Hello Mister Funnypants\n"
+
+
+class RotatingFileOutputTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.fname = os.path.join(self.dir, 'log')
+        self.line = formats.shell_format(numbered(0))
+
+    def make_output(self, **kwargs):
+        o = outputs.RotatingFileOutput(self.fname, formats.shell_format, close_atexit=False,
+                                       **kwargs)
+        self.addCleanup(o.close)
+        return o
+
+    def read(self, path):
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rb') as f:
+            return f.read().decode('utf-8').splitlines()
+
+    def written(self, o):
+        lines = []
+        for path in o.segments() + [self.fname]:
+            lines.extend(line.split('|')[-1] for line in self.read(path))
+        return lines
+
+    def test_max_bytes(self):
+        o = self.make_output(max_bytes=len(self.line) * 2)
+        for i in range(5):
+            o.output(numbered(i))
+        o.close()
+        assert len(o.segments()) == 2
+        assert self.written(o) == [str(i) for i in range(5)]
+
+    def test_backup_count(self):
+        o = self.make_output(max_bytes=1, backup_count=3)
+        for i in range(10):
+            o.output(numbered(i))
+        o.close()
+        assert len(o.segments()) == 3
+        assert self.written(o) == ['7', '8', '9']
+
+    def test_interval(self):
+        o = self.make_output(interval=3600)
+        o.output(numbered(0))
+        assert o.segments() == []
+        o._rotate_at = time.time()
+        o.output(numbered(1))
+        o.output(numbered(2))
+        o.close()
+        assert len(o.segments()) == 1
+        assert o._rotate_at > time.time()
+        assert self.written(o) == ['0', '1', '2']
+
+    def test_gzip(self):
+        o = self.make_output(max_bytes=1, compress='gzip')
+        for i in range(3):
+            o.output(numbered(i))
+        o.close()
+        segments = o.segments()
+        assert len(segments) == 3
+        assert all(s.endswith('.gz') for s in segments)
+        assert self.written(o) == ['0', '1', '2']
+
+    @unittest.skipIf(outputs.lzma is None, "requires lzma")
+    def test_lzma(self):
+        o = self.make_output(max_bytes=1, compress='lzma')
+        o.output(numbered(0))
+        o.close()
+        segment, = o.segments()
+        assert segment.endswith('.xz')
+        with outputs.lzma.open(segment) as f:
+            assert f.read().decode('utf-8') == self.line
+
+    def test_async(self):
+        for async_mode in ('process', 'thread'):
+            o = outputs.RotatingFileOutput(self.fname, formats.shell_format,
+                                           max_bytes=len(self.line) * 10, compress='gzip',
+                                           backup_count=None, msg_buffer=-1,
+                                           close_atexit=False, async_mode=async_mode)
+            for i in range(100):
+                o.output(numbered(i))
+            o.close()
+            assert self.written(o) == [str(i) for i in range(100)]
+            for path in o.segments() + [self.fname]:
+                os.remove(path)
+
+    def test_bad_compress(self):
+        with self.assertRaises(ValueError):
+            self.make_output(compress='zip')
+
+
+class SmallChunkMmapOutput(outputs.MmapOutput):
+
+    chunk_size = 64
+
+
+class MmapOutputTest(unittest.TestCase):
+
+    def setUp(self):
+        self.fname = tempfile.mktemp()
+
+    def tearDown(self):
+        try:
+            os.remove(self.fname)
+        except Exception:
+            pass
+
+    def make_output(self, cls=outputs.MmapOutput, **kwargs):
+        return cls(self.fname, formats.shell_format, close_atexit=False, **kwargs)
+
+    def written(self):
+        with open(self.fname, 'rb') as f:
+            return [line.split(b'|')[-1] for line in f.read().splitlines()]
+
+    def test_sync(self):
+        o = self.make_output()
+        for i in range(3):
+            o.output(numbered(i))
+        assert os.path.getsize(self.fname) == o.chunk_size
+        o.close()
+        assert self.written() == [b'0', b'1', b'2']
+
+    def test_grow(self):
+        o = self.make_output(SmallChunkMmapOutput)
+        for i in range(20):
+            o.output(numbered(i))
+        assert os.path.getsize(self.fname) > 64
+        o.close()
+        assert self.written() == [str(i).encode('ascii') for i in range(20)]
+
+    def test_reopen(self):
+        for i in range(3):
+            o = self.make_output(SmallChunkMmapOutput)
+            o.output(numbered(i))
+            o.close()
+        assert self.written() == [b'0', b'1', b'2']
+
+    def test_async(self):
+        for async_mode in ('process', 'thread'):
+            o = self.make_output(SmallChunkMmapOutput, msg_buffer=-1, async_mode=async_mode)
+            for i in range(100):
+                o.output(numbered(i))
+            o.close()
+            assert self.written() == [str(i).encode('ascii') for i in range(100)]
+            os.remove(self.fname)
+
+    @unittest.skipIf(not hasattr(signal, 'SIGKILL'), "requires SIGKILL")
+    def test_killed(self):
+        script = ("import os, signal, time\n"
+                  "from twiggy import formats, levels, outputs\n"
+                  "from twiggy.message import Message\n"
+                  "o = outputs.MmapOutput({0!r}, formats.shell_format, close_atexit=False)\n"
+                  "o.chunk_size = 4096\n"
+                  "for i in range(1000):\n"
+                  "    o.output(Message(levels.DEBUG, 'line {{0}}', {{'name': 'jose',\n"
+                  "                     'time': time.gmtime()}},\n"
+                  "                     Message._default_options, [i], {{}}))\n"
+                  "os.kill(os.getpid(), signal.SIGKILL)\n".format(self.fname))
+        proc = subprocess.Popen([sys.executable, '-c', script])
+        proc.wait()
+        assert proc.returncode == -signal.SIGKILL
+
+        # everything written is there, padded to a whole chunk
+        with open(self.fname, 'rb') as f:
+            data = f.read()
+        expected = b''.join(b'DEBUG:jose|line %d\n' % i for i in range(1000))
+        assert data.rstrip(b'\0') == expected
+        assert len(data) % 4096 == 0
+
+        # and appending carries on after it
+        o = self.make_output(SmallChunkMmapOutput)
+        o.output(numbered(1000))
+        o.close()
+        with open(self.fname, 'rb') as f:
+            data = f.read()
+        assert data.startswith(expected)
+        assert data[len(expected):].split(b'|')[-1] == b'1000\n'
+
+
+class SocketOutputTest(unittest.TestCase):
+
+    def setUp(self):
+        self.internal = capture_internal_log(self)
+        self.format = formats.SyslogFormat(hostname='host', app_name='app')
+
+    def make_output(self, cls, address, **kwargs):
+        o = cls(address, self.format, close_atexit=False, **kwargs)
+        self.addCleanup(o.close)
+        return o
+
+    def udp_server(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.addCleanup(server.close)
+        server.bind(('127.0.0.1', 0))
+        server.settimeout(5)
+        return server
+
+    def unix_path(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        return os.path.join(directory, 'sock')
+
+    def accept(self, server):
+        conn, _ = server.accept()
+        self.addCleanup(conn.close)
+        conn.settimeout(5)
+        return conn
+
+    def recv_lines(self, conn, n):
+        data = b''
+        while data.count(b'\n') < n:
+            chunk = conn.recv(65536)
+            assert chunk
+            data += chunk
+        return data.splitlines()
+
+    def test_udp(self):
+        server = self.udp_server()
+        o = self.make_output(outputs.DatagramOutput, server.getsockname())
+        o.output(numbered(1))
+        o.output(numbered(2, levels.ERROR))
+        assert server.recv(65536) == b'<15>1 2010-10-28T02:15:57Z host app - - - 1'
+        assert server.recv(65536) == b'<11>1 2010-10-28T02:15:57Z host app - - - 2'
+
+    def test_udp_truncated(self):
+        server = self.udp_server()
+        o = self.make_output(outputs.DatagramOutput, server.getsockname(), mtu=20)
+        o.output(numbered(1))
+        assert server.recv(65536) == b'<15>1 2010-10-28T02:'
+
+    def test_udp_packed(self):
+        server = self.udp_server()
+        line = len(self.format(numbered(0)))
+        o = self.make_output(outputs.DatagramOutput, server.getsockname(), pack=True,
+                             mtu=line * 3 + 2, msg_buffer=-1, async_mode='thread', linger=1)
+        for i in range(7):
+            o.output(numbered(i))
+        o.close()
+        datagrams = [server.recv(65536) for i in range(3)]
+        assert [len(d.splitlines()) for d in datagrams] == [3, 3, 1]
+        assert [d.split(b' ')[-1] for d in b'\n'.join(datagrams).splitlines()] == [
+            str(i).encode('ascii') for i in range(7)]
+
+    @unittest.skipIf(not hasattr(socket, 'AF_UNIX'), "requires unix sockets")
+    def test_unix_datagram(self):
+        path = self.unix_path()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.addCleanup(server.close)
+        server.bind(path)
+        server.settimeout(5)
+        o = self.make_output(outputs.DatagramOutput, path)
+        o.output(numbered(1))
+        assert server.recv(65536).endswith(b' 1')
+
+    def test_tcp(self):
+        for framing in ('newline', 'octet'):
+            server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.addCleanup(server.close)
+            server.bind(('127.0.0.1', 0))
+            server.listen(1)
+            o = outputs.TCPOutput(server.getsockname(), self.format, framing=framing,
+                                  msg_buffer=-1, close_atexit=False, async_mode='process')
+            for i in range(10):
+                o.output(numbered(i))
+            o.close()
+
+            conn = self.accept(server)
+            data = b''
+            while True:
+                chunk = conn.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+
+            if framing == 'octet':
+                lines = []
+                while data:
+                    length, data = data.split(b' ', 1)
+                    lines.append(data[:int(length)])
+                    data = data[int(length):]
+            else:
+                lines = data.splitlines()
+            assert [line.split(b' ')[-1] for line in lines] == [
+                str(i).encode('ascii') for i in range(10)]
+
+    @unittest.skipIf(not hasattr(socket, 'AF_UNIX'), "requires unix sockets")
+    def test_reconnect(self):
+        path = self.unix_path()
+        o = self.make_output(outputs.TCPOutput, path)
+        o.output(numbered(1))
+        assert o.unsent == 1
+        assert len(self.internal) == 1
+        assert o._retry_at > time.time()
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(server.close)
+        server.bind(path)
+        server.listen(1)
+        # still backing off
+        o.output(numbered(2))
+        assert o.unsent == 2
+
+        o._retry_at = 0
+        o.output(numbered(3))
+        conn = self.accept(server)
+        assert self.recv_lines(conn, 1) == [b'<15>1 2010-10-28T02:15:57Z host app - - - 3']
+        assert o.unsent == 2
+
+        # a connection closed by the server is noticed, and retried at once
+        conn.close()
+        first = o._sock
+        for i in range(4, 1000):
+            o.output(numbered(i))
+            if o._sock is not first:
+                break
+        conn = self.accept(server)
+        assert self.recv_lines(conn, 1) == [
+            '<15>1 2010-10-28T02:15:57Z host app - - - {0}'.format(i).encode('ascii')]
+        assert o.unsent == 2
+
+    def test_bad_framing(self):
+        with self.assertRaises(ValueError):
+            outputs.TCPOutput(('127.0.0.1', 1), self.format, framing='json')
+
 
 class StreamOutputTest(unittest.TestCase):
 
@@ -87,6 +803,20 @@ class StreamOutputTest(unittest.TestCase):
         assert sio.getvalue() == "DEBUG:jose:shirt=42|Hello Mister Funnypants\n"
 
 
+class WriteBatchTest(unittest.TestCase):
+
+    def test_default_write_batch(self):
+        o = outputs.ListOutput(close_atexit=False)
+        o._write_batch(['a', 'b'])
+        assert o.messages == ['a', 'b']
+
+    def test_stream_write_batch(self):
+        sio = StringIO()
+        o = outputs.StreamOutput(formats.shell_format, sio)
+        o._write_batch(['a\n', 'b\n'])
+        assert sio.getvalue() == "a\nb\n"
+
+
 class ListOutputTest(unittest.TestCase):
 
     def test_list_output(self):
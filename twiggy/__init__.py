@@ -1,4 +1,3 @@
-import time
 import warnings
 import sys
 import os
@@ -8,6 +7,7 @@ from . import filters
 from . import formats
 from . import outputs
 from . import levels
+from .lib import clock
 from .lib.validators import _validate_config
 
 
@@ -27,7 +27,7 @@ def _populate_globals():
         raise RuntimeError("Attempted to populate globals twice")
 
     # a useful default fields
-    __fields = {'time': time.gmtime}
+    __fields = {'time': clock.now}
 
     log = logger.Logger(__fields)
 
@@ -1,15 +1,21 @@
 """Logging feature to add information about process, etc."""
 
 from ..lib import thread_name
+from ..lib.fields import per_process, per_thread
 import platform
 import os
 
+# these only change across processes or threads, so don't look them up for every message
+_hostname = per_process(platform.node)
+_pid = per_process(os.getpid)
+_thread = per_thread(thread_name)
+
 
 def procinfo(self):
     """Adds the following fields:
 
     :hostname: current hostname
     :pid: current process id
-    :thread: current thread name
+    :thread: current thread name. Cached per thread, so renaming a thread isn't noticed.
     """
-    return self.fields(hostname=platform.node, pid=os.getpid, thread=thread_name)
+    return self.fields(hostname=_hostname, pid=_pid, thread=_thread)
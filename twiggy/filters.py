@@ -1,20 +1,64 @@
 import fnmatch
 import re
+import sys
+import weakref
 
-from six import string_types
+from six import iteritems, string_types
 
 from . import levels
 
 __re_type = type(re.compile('foo'))  # XXX is there a canonical place for this?
 
 
+#: the maximum number of names for which `.name_only` filters cache their decisions
+name_cache_size = 1024
+
+
+def name_only(f):
+    """mark a filter as only looking at the message's name, and cache its decisions by name
+
+    Name-only filters are only called once per name; `.Logger` may skip calling them at all
+    once it has seen a name.
+
+    :arg f: a `.filter` whose result depends only on ``msg.name``
+    :returns: a filter function, with a true ``name_only`` attribute
+    """
+    decisions = {}
+
+    def name_only_filter(msg):
+        name = msg.name
+        try:
+            return decisions[name]
+        except KeyError:
+            pass
+        except TypeError:
+            # unhashable name
+            return f(msg)
+        decision = f(msg)
+        if len(decisions) >= name_cache_size:
+            decisions.clear()
+        decisions[name] = decision
+        return decision
+
+    name_only_filter.name_only = True
+    name_only_filter.__name__ = getattr(f, '__name__', name_only_filter.__name__)
+    return name_only_filter
+
+
+def _constant_filter(x):
+    def constant_filter(msg):
+        return x
+    # trivially doesn't depend on anything else
+    constant_filter.name_only = True
+    return constant_filter
+
+
 def msg_filter(x):
     """intelligently create a filter"""
-    # XXX replace lambdas with nicely-named functions, for debugging
     if x is None:
-        return lambda msg: True
+        return _constant_filter(True)
     elif isinstance(x, bool):
-        return lambda msg: x
+        return _constant_filter(x)
     elif isinstance(x, string_types):
         return regex_wrapper(re.compile(x))
     elif isinstance(x, __re_type):
@@ -33,6 +77,8 @@ def list_wrapper(lst):
 
     def wrapped(msg):
         return all(f(msg) for f in filts)
+    if all(getattr(f, 'name_only', False) for f in filts):
+        wrapped.name_only = True
     return wrapped
 
 
@@ -58,6 +104,8 @@ def names(*names):
     def set_names_filter(msg):
         return msg.name in names_set
     set_names_filter.names = names
+    # a set lookup is as cheap as caching would be, so just mark it
+    set_names_filter.name_only = True
     return set_names_filter
 
 
@@ -73,6 +121,7 @@ def glob_names(*names):
     # copied from fnmatch.fnmatchcase - for speed
     patterns = [re.compile(fnmatch.translate(pat)) for pat in names]
 
+    @name_only
     def glob_names_filter(msg):
         return any(pat.match(msg.name) is not None for pat in patterns)
     glob_names_filter.names = names
@@ -90,6 +139,15 @@ class Emitter(object):
         self.filter = filter
         self._output = output
 
+    @property
+    def min_level(self):
+        return self._min_level
+
+    @min_level.setter
+    def min_level(self, level):
+        self._min_level = level
+        _invalidate_emitter_dicts()
+
     @property
     def filter(self):
         return self._filter
@@ -97,3 +155,155 @@ class Emitter(object):
     @filter.setter
     def filter(self, f):
         self._filter = msg_filter(f)
+        _invalidate_emitter_dicts()
+
+
+# all live EmitterDicts, so changes to an Emitter can invalidate their dispatch tables
+# (dicts aren't hashable, so key by id)
+_emitter_dicts = weakref.WeakValueDictionary()
+
+
+def _invalidate_emitter_dicts():
+    for d in list(_emitter_dicts.values()):
+        d._invalidate()
+
+
+class EmitterDict(dict):
+    """A dict of `Emitters <.Emitter>`, keyed by name
+
+    Keeps a dispatch table of pre-sorted emitters for each `.LogLevel`. The table is rebuilt
+    lazily, the first time it is needed after the dict or one of its Emitters changes.
+
+    Also tracks the lowest ``min_level`` of its Emitters, so that loggers can discard messages
+    nobody wants with a single comparison.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(EmitterDict, self).__init__(*args, **kwargs)
+        #: incremented on every change - for internal use
+        self._version = 0
+        self._compiled_version = -1
+        self._dispatch = {}
+        #: lowest ``min_level._value`` of any Emitter, or 0 if not yet known - for internal use
+        self._min_value = 0
+        #: (level, name) -> (outputs, entries), see `._name_dispatch_for`
+        self._name_dispatch = {}
+        #: classes depending on the dispatch table, with an ``_emitters_changed(self)``
+        #: classmethod. Maintained by `.Logger` - for internal use
+        self._dependents = {}
+        _emitter_dicts[id(self)] = self
+
+    def _invalidate(self):
+        self._version += 1
+        # let everything through until we've recompiled
+        self._min_value = 0
+        self._notify_dependents()
+
+    def _notify_dependents(self):
+        for dependent in list(self._dependents.values()):
+            dependent._emitters_changed(self)
+
+    def _compile(self):
+        """rebuild the dispatch table - for internal use
+
+        :returns: dict mapping each `.LogLevel` to a tuple of ``(name, filter, output)``, sorted
+            by name.
+        """
+        version = self._version
+        # sort to make things deterministic (for tests, mainly)
+        ordered = sorted(list(iteritems(self)))
+        dispatch = {}
+        for level in levels.LogLevel._name2levels.values():
+            dispatch[level] = tuple((name, emitter.filter, emitter._output)
+                                    for name, emitter in ordered
+                                    if level >= emitter.min_level)
+        self._dispatch = dispatch
+        self._name_dispatch = {}
+        self._min_value = min(e.min_level._value for n, e in ordered) if ordered else sys.maxsize
+        # if we raced with a change, the next call will compile again
+        self._compiled_version = version
+        if self._version != version:
+            self._min_value = 0
+        self._notify_dependents()
+        return dispatch
+
+    def _name_dispatch_for(self, level, selected, msg):
+        """split ``selected`` by whether ``msg`` is wanted because of its name alone - for
+        internal use
+
+        Filters marked `.name_only` are called the first time a name is seen at a level; after
+        that, the decision is cached until the dispatch table is rebuilt.
+
+        :arg selected: the dispatch table entries for ``level``
+        :returns: tuple of ``(outputs, entries)``, where ``outputs`` should get the message and
+            ``entries`` still need their filters called.
+        """
+        try:
+            key = (level, msg.name)
+            return self._name_dispatch[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # unhashable name
+            return (), selected
+
+        outputs, entries = [], []
+        for entry in selected:
+            if not getattr(entry[1], 'name_only', False):
+                entries.append(entry)
+                continue
+            try:
+                include = entry[1](msg)
+            except Exception:
+                # don't cache; let the logger report the error for every message
+                entries.append(entry)
+                continue
+            if include:
+                outputs.append(entry[2])
+
+        result = tuple(outputs), tuple(entries)
+        name_dispatch = self._name_dispatch
+        # don't remember decisions for a table that was rebuilt meanwhile
+        if self._dispatch.get(level) is selected:
+            if len(name_dispatch) >= name_cache_size:
+                name_dispatch.clear()
+            name_dispatch[key] = result
+        return result
+
+    def __setitem__(self, key, value):
+        super(EmitterDict, self).__setitem__(key, value)
+        self._invalidate()
+
+    def __delitem__(self, key):
+        super(EmitterDict, self).__delitem__(key)
+        self._invalidate()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self):
+        super(EmitterDict, self).clear()
+        self._invalidate()
+
+    def pop(self, *args):
+        try:
+            return super(EmitterDict, self).pop(*args)
+        finally:
+            self._invalidate()
+
+    def popitem(self):
+        try:
+            return super(EmitterDict, self).popitem()
+        finally:
+            self._invalidate()
+
+    def setdefault(self, key, default=None):
+        try:
+            return super(EmitterDict, self).setdefault(key, default)
+        finally:
+            self._invalidate()
+
+    def update(self, *args, **kwargs):
+        super(EmitterDict, self).update(*args, **kwargs)
+        self._invalidate()
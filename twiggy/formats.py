@@ -1,13 +1,28 @@
+import codecs
 import copy
+import json
+import re
+import socket
+import time
+from json.encoder import encode_basestring
 
+from six import PY3, binary_type, text_type
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+from . import levels
+from .lib.clock import Timestamp
 from .lib.converter import ConversionTable, Converter
-from .lib import iso8601time
+from .lib import ISO8601Renderer
 
 #: a default line-oriented converter
 line_conversion = ConversionTable([
     Converter(key='time',
               # ISO 8601 - it sucks less!
-              convert_value=iso8601time,
+              convert_value=ISO8601Renderer(),
               convert_item='{1}'.format,
               required=True),
     ('level', str, '{1}'.format, True),
@@ -20,22 +35,33 @@ line_conversion.aggregate = ':'.join
 
 
 class LineFormat(object):
-    """format a message for text-oriented output. Returns a string."""
+    """format a message for text-oriented output. Returns a string, or bytes if it has an
+    ``encoding``.
+
+    :ivar bool binary: does it return bytes. Outputs may write bytes without encoding them again.
+    """
 
-    def __init__(self, separator='|', traceback_prefix='\nTRACE ', conversion=line_conversion):
+    def __init__(self, separator='|', traceback_prefix='\nTRACE ', conversion=line_conversion,
+                 encoding=None):
         self.separator = separator
         self.traceback_prefix = traceback_prefix
         self.conversion = conversion
+        self.encoding = encoding
+        self.binary = encoding is not None
 
     # XXX test this!
     def __copy__(self):
-        return self.__class__(self.separator, self.traceback_prefix, self.conversion.copy())
+        return self.__class__(self.separator, self.traceback_prefix, self.conversion.copy(),
+                              self.encoding)
 
     def __call__(self, msg):
         fields = self.format_fields(msg)
         text = self.format_text(msg)
         trace = self.format_traceback(msg)
-        return "{fields}{self.separator}{text}{trace}\n".format(**locals())  # XXX gross?
+        line = "{fields}{self.separator}{text}{trace}\n".format(**locals())  # XXX gross?
+        if self.encoding is not None:
+            return line.encode(self.encoding, 'backslashreplace')
+        return line
 
     def format_text(self, msg):
         """format the text part of a message"""
@@ -62,6 +88,230 @@ class LineFormat(object):
         return fields_text
 
 
+class SyslogFormat(object):
+    """format a message as an RFC 5424 syslog message. Returns bytes, without framing.
+
+    The ``time`` field is the timestamp, and ``name`` the APP-NAME unless there's an
+    ``app_name``. A ``pid`` field, as added by the ``procinfo`` feature, is the PROCID. Other
+    fields become the parameters of a single SD-ELEMENT with id `.sd_id`. Tracebacks follow
+    the text.
+    """
+
+    binary = True
+
+    #: syslog severities of `.LogLevel`\s
+    severities = {levels.DEBUG: 7, levels.INFO: 6, levels.NOTICE: 5, levels.WARNING: 4,
+                  levels.ERROR: 3, levels.CRITICAL: 2}
+
+    _header_fields = frozenset(('time', 'level', 'name', 'pid'))
+    # characters not allowed in a header field or SD-NAME
+    _bad_name = re.compile(r'[^!-~]|[=\]"]')
+    _sd_escape = re.compile(r'(["\\\]])')
+    # TIMESTAMP, from a struct_time or `.Timestamp`
+    _timestamp = ISO8601Renderer()
+
+    def __init__(self, facility=1, app_name=None, hostname=None, sd_id='fields@32473',
+                 encoding='utf-8'):
+        """
+        :arg int facility: the syslog facility. Defaults to 1, user-level messages.
+        :arg str app_name: the APP-NAME. If None, use the message's name.
+        :arg str hostname: the HOSTNAME. If None, use :func:`socket.gethostname`.
+        :arg str sd_id: the SD-ID for fields.
+        :arg str encoding: the encoding of the bytes returned
+        """
+        self.facility = facility
+        self.app_name = app_name
+        self.hostname = hostname if hostname is not None else socket.gethostname()
+        self.sd_id = sd_id
+        self.encoding = encoding
+
+    def _name(self, x, length):
+        """``x`` as a header field or SD-NAME of at most ``length`` characters, or nil"""
+        return self._bad_name.sub('_', str(x))[:length] or '-'
+
+    def __call__(self, msg):
+        fields = msg.fields
+        pri = self.facility * 8 + self.severities.get(msg.level, 7)
+        when = fields.get('time')
+        timestamp = self._timestamp(when) if when is not None else '-'
+        app_name = self.app_name if self.app_name is not None else fields.get('name') or '-'
+        procid = fields.get('pid', '-')
+
+        params = ' '.join('{0}="{1}"'.format(self._name(k, 32),
+                                             self._sd_escape.sub(r'\\\1', str(v)))
+                          for k, v in sorted(fields.items())
+                          if k not in self._header_fields)
+        sd = '[{0} {1}]'.format(self._name(self.sd_id, 32), params) if params else '-'
+
+        text = msg.text
+        if msg.traceback is not None:
+            text = text + '\n' + msg.traceback.rstrip('\n')
+        line = '<{0}>1 {1} {2} {3} {4} - {5} {6}'.format(
+            pri, timestamp, self._name(self.hostname, 255), self._name(app_name, 48),
+            self._name(procid, 128), sd, text)
+        return line.encode(self.encoding, 'backslashreplace')
+
+
+def _float(v):
+    """``v`` as JSON. NaN & infinities, which JSON doesn't have, are null."""
+    if v - v == 0:
+        return float.__repr__(v)
+    return 'null'
+
+
+class JSONFormat(object):
+    """format a message as one line of JSON, for JSON Lines. Returns a string, or bytes if it
+    has an ``encoding``.
+
+    The object has the message's fields, in the order they were bound, then its text and
+    traceback, if any. Values are written according to their type: a `.LogLevel` as its name; a
+    `.Timestamp` or struct_time by ``render_time``; strings, numbers, bools & None as
+    themselves, with NaN & infinities as null. Anything else is written as by
+    :func:`json.dumps`, with ``default`` to convert objects it can't.
+
+    With `orjson <https://github.com/ijl/orjson>`_ installed, that's used to encode instead,
+    which is faster with many fields. Floats may be written differently, though with the same
+    value.
+
+    :ivar bool binary: does it return bytes. Outputs may write bytes without encoding them again.
+    """
+
+    #: keys cached with their encoding, per format
+    key_cache_size = 1024
+
+    def __init__(self, text_key='message', traceback_key='traceback', render_time=None,
+                 default=str, encoding=None, backend=None):
+        """
+        :arg str text_key: the key of the text. A field with the same key is left out.
+        :arg str traceback_key: the key of the traceback. A field with the same key is left out.
+        :arg render_time: one-argument function returning a `.Timestamp` or struct_time as text.
+            If None, an `.ISO8601Renderer` with millisecond precision.
+        :arg default: one-argument function converting objects JSON can't represent to ones it
+            can, as for :func:`json.dumps`
+        :arg str encoding: the encoding of the bytes returned, or None to return a string.
+            JSON Lines must be UTF-8.
+        :arg str backend: ``orjson`` or ``json`` to encode with the standard library. If None,
+            orjson if it's installed.
+        """
+        if backend is None:
+            backend = 'json' if orjson is None else 'orjson'
+        elif backend not in ('json', 'orjson'):
+            raise ValueError("Unknown backend {0!r}".format(backend))
+        elif backend == 'orjson' and orjson is None:
+            raise ValueError("backend='orjson' requires the orjson module")
+        if render_time is None:
+            render_time = ISO8601Renderer(precision='ms')
+
+        self.text_key = text_key
+        self.traceback_key = traceback_key
+        self.render_time = render_time
+        self.default = default
+        self.encoding = encoding
+        self.binary = encoding is not None
+        self.backend = backend
+        # orjson's bytes can be returned as is
+        self._utf8 = encoding is not None and codecs.lookup(encoding).name == 'utf-8'
+
+        def quoted_time(v):
+            return encode_basestring(render_time(v))
+
+        # functions returning JSON for values of exactly these types
+        self._encoders = {text_type: encode_basestring,
+                          int: int.__repr__,
+                          float: _float,
+                          bool: {True: 'true', False: 'false'}.__getitem__,
+                          type(None): lambda v: 'null',
+                          levels.LogLevel: lambda v: '"' + str(v) + '"',
+                          Timestamp: quoted_time,
+                          time.struct_time: quoted_time}
+        if PY3:  # pragma: no py2 cover
+            self._encoders[binary_type] = lambda v: encode_basestring(
+                v.decode('utf-8', 'replace'))
+        else:  # pragma: no py3 cover
+            self._encoders[binary_type] = encode_basestring
+            self._encoders[long] = long.__repr__  # noqa: F821
+
+        # key -> '"key":', or None for keys left out
+        self._keys = {text_key: None, traceback_key: None}
+        self._text_key = encode_basestring(text_key) + ':'
+        self._traceback_key = encode_basestring(traceback_key) + ':'
+
+    def __copy__(self):
+        return self.__class__(self.text_key, self.traceback_key, self.render_time, self.default,
+                              self.encoding, self.backend)
+
+    def __call__(self, msg):
+        if self.backend == 'orjson':
+            try:
+                return self._orjson(msg)
+            except orjson.JSONEncodeError:
+                # such as for strings with lone surrogates
+                pass
+
+        keys = self._keys
+        encoders = self._encoders
+        parts = []
+        for k, v in msg.fields.items():
+            try:
+                key = keys[k]
+            except KeyError:
+                key = self._key(k)
+            if key is None:
+                continue
+            try:
+                encode = encoders[v.__class__]
+            except KeyError:
+                parts.append(key + json.dumps(v, default=self.default, ensure_ascii=False,
+                                              separators=(',', ':')))
+            else:
+                parts.append(key + encode(v))
+
+        parts.append(self._text_key + encode_basestring(msg.text))
+        if msg.traceback is not None:
+            parts.append(self._traceback_key + encode_basestring(msg.traceback))
+
+        line = '{' + ','.join(parts) + '}\n'
+        if self.encoding is not None:
+            return line.encode(self.encoding, 'backslashreplace')
+        return line
+
+    def _key(self, k):
+        """return the key ``k`` encoded, caching it - for internal use"""
+        key = encode_basestring(k if isinstance(k, text_type) else text_type(k)) + ':'
+        if len(self._keys) < self.key_cache_size:
+            self._keys[k] = key
+        return key
+
+    def _orjson(self, msg):
+        """encode ``msg`` with orjson - for internal use"""
+        keys = self._keys
+        render_time = self.render_time
+        d = {}
+        for k, v in msg.fields.items():
+            if keys.get(k, '') is None:
+                continue
+            cls = v.__class__
+            if cls is Timestamp or cls is time.struct_time:
+                v = render_time(v)
+            elif cls is levels.LogLevel:
+                v = str(v)
+            elif cls is binary_type:
+                v = v.decode('utf-8', 'replace')
+            d[k] = v
+        d[self.text_key] = msg.text
+        if msg.traceback is not None:
+            d[self.traceback_key] = msg.traceback
+
+        line = orjson.dumps(d, default=self.default,
+                            option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+        if self._utf8:
+            return line
+        line = line.decode('utf-8')
+        if self.encoding is not None:
+            return line.encode(self.encoding, 'backslashreplace')
+        return line
+
+
 #
 # some useful default objects
 #
@@ -69,6 +319,15 @@ class LineFormat(object):
 #: a decent-looking format for line-oriented output
 line_format = LineFormat(conversion=line_conversion)
 
+#: `.line_format`, encoded as UTF-8 bytes
+line_bytes_format = LineFormat(conversion=line_conversion, encoding='utf-8')
+
+#: a `.JSONFormat`, for JSON Lines
+json_format = JSONFormat()
+
+#: `.json_format`, encoded as UTF-8 bytes
+json_bytes_format = JSONFormat(encoding='utf-8')
+
 #: a format for use in the shell - no timestamp
 shell_format = copy.copy(line_format)
 shell_format.conversion.get('time').convert_item = lambda k, v: None
@@ -43,12 +43,13 @@ class LogLevel(with_metaclass(LogLevelMeta, object)):
     Levels are opaque; they may be compared to each other, but nothing else.
     """
 
-    __slots__ = ['__name', '__value']
+    # _value is the level as an int, for fast comparisons within twiggy
+    __slots__ = ['__name', '_value']
     _name2levels = {}
 
     def __init__(self, name, value):
         self.__name = name
-        self.__value = value
+        self._value = value
         self._name2levels[name] = self
 
     def __str__(self):
@@ -58,54 +59,54 @@ class LogLevel(with_metaclass(LogLevelMeta, object)):
         return "<LogLevel %s>" % self.__name
 
     def _lt(self, other):  # pragma: no py2 cover
-        if not isinstance(other, LogLevel):
+        try:
+            return self._value < other._value
+        except AttributeError:
             return NotImplemented
-        else:
-            return self.__value < other.__value
 
     def _le(self, other):  # pragma: no py2 cover
-        if not isinstance(other, LogLevel):
+        try:
+            return self._value <= other._value
+        except AttributeError:
             return NotImplemented
-        else:
-            return self.__value <= other.__value
 
     def _gt(self, other):  # pragma: no py2 cover
-        if not isinstance(other, LogLevel):
+        try:
+            return self._value > other._value
+        except AttributeError:
             return NotImplemented
-        else:
-            return self.__value > other.__value
 
     def _ge(self, other):  # pragma: no py2 cover
-        if not isinstance(other, LogLevel):
+        try:
+            return self._value >= other._value
+        except AttributeError:
             return NotImplemented
-        else:
-            return self.__value >= other.__value
 
     def __eq__(self, other):
         if not isinstance(other, LogLevel):
             return False
         else:
-            return self.__value == other.__value
+            return self._value == other._value
 
     def __ne__(self, other):
         if not isinstance(other, LogLevel):
             return True
         else:
-            return self.__value != other.__value
+            return self._value != other._value
 
     def __cmp__(self, other):  # pragma: no py3 cover
         # Python 2 only
         if not isinstance(other, LogLevel):
             raise TypeError('Unorderable types LogLevel() and %s' % type(other))
-        elif self.__value < other.__value:
+        elif self._value < other._value:
             return -1
-        elif self.__value > other.__value:
+        elif self._value > other._value:
             return 1
         else:
             return 0
 
     def __hash__(self):
-        return hash(self.__value)
+        return hash(self._value)
 
 
 def name2level(name):
@@ -1,3 +1,4 @@
+import calendar
 import threading
 import time
 
@@ -15,3 +16,136 @@ def iso8601time(gmtime=None):
     XXX timezone is not supported
     """
     return time.strftime("%Y-%m-%dT%H:%M:%SZ", gmtime if gmtime is not None else time.gmtime())
+
+
+#: three digits of fractions of a second, with & without a leading ``.``
+_milliseconds = [".%03d" % i for i in range(1000)]
+_digits = ["%03d" % i for i in range(1000)]
+
+
+def _local_offset(seconds):
+    """the local time's offset from UTC in seconds, at ``seconds`` since the epoch"""
+    return calendar.timegm(time.localtime(seconds)) - seconds
+
+
+class ISO8601Renderer(object):
+    """convert times to ISO 8601 format, quickly
+
+    Times may be seconds since the epoch, as from :func:`time.time`, or a UTC
+    :class:`time.struct_time`, as from :func:`time.gmtime`. The text up to the seconds is
+    cached, so only sub-second digits are formatted for each time within the same second.
+
+    Usable as the ``convert_value`` of the ``time`` `.Converter` in a `.ConversionTable`;
+    ``ISO8601Renderer()`` returns the same as `.iso8601time`.
+
+    :ivar str precision: ``s`` for whole seconds, ``ms`` for milliseconds or ``us`` for
+        microseconds. A struct_time has no fraction of a second, so gets zeros.
+    :ivar tz: ``utc``, suffixed ``Z``; ``local``, the local time with its offset, which is
+        looked up again only when it changes, as at DST boundaries; or a fixed offset east of
+        UTC, in seconds.
+    """
+
+    _digits = {'s': 0, 'ms': 3, 'us': 6}
+
+    #: takes `.Timestamp`\s, rather than needing a struct_time. See `.Converter`.
+    accepts_timestamps = True
+
+    def __init__(self, precision='s', tz='utc'):
+        try:
+            digits = self._digits[precision]
+        except KeyError:
+            raise ValueError("Unknown precision {0!r}".format(precision))
+        if tz not in ('utc', 'local') and not isinstance(tz, int):
+            raise ValueError("Unknown tz {0!r}".format(tz))
+
+        self.precision = precision
+        self.tz = tz
+        self._divisor = 10 ** (6 - digits) if digits else None
+        # (second, text, suffix)
+        self._second = (None, None, None)
+        # (struct_time, text)
+        self._struct = (None, None)
+        # (valid from, valid until, local offset)
+        self._local = (0, 0, 0)
+
+    def __call__(self, t=None):
+        """
+        :arg t: seconds since the epoch, or a UTC struct_time. If None, use the current time.
+        """
+        if t.__class__ is not float:
+            if t is None:
+                t = time.time()
+            elif isinstance(t, time.struct_time):
+                cached = self._struct
+                if cached[0] == t:
+                    return cached[1]
+                text = self(calendar.timegm(t))
+                self._struct = (t, text)
+                return text
+
+        divisor = self._divisor
+        if divisor is None:
+            second = int(t // 1)
+            cached = self._second
+            if cached[0] != second:
+                cached = self._second = self._entry(second)
+            return cached[1]
+
+        second = int(t // 1)
+        # round to whole microseconds first, as floats can't hold most decimal fractions
+        # exactly. Splitting off the second keeps the arithmetic in small ints.
+        micros = int((t - second) * 1000000 + 0.5)
+        if micros == 1000000:
+            second += 1
+            micros = 0
+        cached = self._second
+        if cached[0] != second:
+            cached = self._second = self._entry(second)
+        # looking up digits is much cheaper than formatting them
+        if divisor == 1000:
+            return cached[1] + _milliseconds[micros // 1000] + cached[2]
+        return (cached[1] + _milliseconds[micros // 1000] + _digits[micros % 1000] +
+                cached[2])
+
+    def _entry(self, second):
+        """return a ``(second, text, suffix)`` cache entry - for internal use
+
+        With a precision, the fraction of a second goes between the text and suffix.
+        """
+        tz = self.tz
+        if tz == 'utc':
+            offset = 0
+        elif tz == 'local':
+            offset = self._local_offset(second)
+        else:
+            offset = tz
+        text = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second + offset))
+
+        if tz == 'utc':
+            suffix = 'Z'
+        else:
+            hours, minutes = divmod(abs(offset) // 60, 60)
+            suffix = "{0}{1:02d}:{2:02d}".format('-' if offset < 0 else '+', hours, minutes)
+        if self._divisor is None:
+            return second, text + suffix, None
+        return second, text, suffix
+
+    def _local_offset(self, second):
+        """the local offset at ``second``, cached until it next changes - for internal use"""
+        start, end, offset = self._local
+        if start <= second < end:
+            return offset
+
+        offset = _local_offset(second)
+        # offsets change at most once a day. If it's changed by tomorrow, find when.
+        start, end = second, second + 86400
+        if _local_offset(end) != offset:
+            low = second
+            while end - low > 1:
+                middle = (low + end) // 2
+                if _local_offset(middle) == offset:
+                    low = middle
+                else:
+                    end = middle
+        self._local = (start, end, offset)
+        return offset
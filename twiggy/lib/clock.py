@@ -0,0 +1,124 @@
+"""Clocks for the ``time`` field"""
+import os
+import threading
+import time
+import weakref
+
+from .fields import _check_pid
+
+__all__ = ['Timestamp', 'now', 'CoarseClock']
+
+
+class Timestamp(float):
+    """seconds since the epoch, as from :func:`time.time`
+
+    A float is much cheaper to get, copy and send to another process than a
+    :class:`time.struct_time`, and keeps fractions of a second. Code expecting a struct_time
+    can use `.struct_time`; a `.ConversionTable` passes it to converters that don't accept
+    timestamps.
+    """
+
+    __slots__ = ['_struct_time']
+
+    @property
+    def struct_time(self):
+        """the UTC struct_time, as from :func:`time.gmtime`. Computed on first access."""
+        try:
+            return self._struct_time
+        except AttributeError:
+            value = self._struct_time = time.gmtime(self)
+            return value
+
+    def __reduce__(self):
+        return (Timestamp, (float(self), ))
+
+    def __repr__(self):
+        return "Timestamp({0!r})".format(float(self))
+
+
+def now():
+    """return the current time as a `.Timestamp`. The default ``time`` field."""
+    return Timestamp(time.time())
+
+
+# all live CoarseClocks, so they can be restarted in a forked child
+_coarse_clocks = weakref.WeakSet()
+
+
+def _reset_coarse_clocks():
+    """forget the ticker threads of every `.CoarseClock` - for internal use"""
+    for clock in list(_coarse_clocks):
+        # another thread may have held the lock when we forked
+        clock._lock = threading.Lock()
+        clock._reset()
+
+
+if not _check_pid:  # pragma: no branch
+    os.register_at_fork(after_in_child=_reset_coarse_clocks)
+
+
+def _tick(ref, ticker):
+    """update the `.CoarseClock` ``ref`` until it's gone or stops ``ticker`` - for internal use"""
+    while True:
+        clock = ref()
+        if clock is None or clock._ticker is not ticker:
+            return
+        clock._now = Timestamp(time.time())
+        resolution = clock.resolution
+        # don't keep it alive while sleeping
+        del clock
+        time.sleep(resolution)
+
+
+class CoarseClock(object):
+    """a clock which returns the time cached by a background thread
+
+    Calling it only reads an attribute, and messages logged within the same tick share one
+    `.Timestamp`. The time returned may be behind by up to `.resolution`, plus however late the
+    thread is scheduled. The thread is started on the first call, and again in a forked child.
+
+    :ivar float resolution: seconds between updates
+    """
+
+    def __init__(self, resolution=0.001):
+        self.resolution = resolution
+        self._lock = threading.Lock()
+        self._reset()
+        _coarse_clocks.add(self)
+
+    def _reset(self):
+        self._now = None
+        self._ticker = None
+        self._pid = None
+
+    def __call__(self):
+        now = self._now
+        if now is None or (_check_pid and self._pid != os.getpid()):
+            return self._start()
+        return now
+
+    def _start(self):
+        """start the ticker thread & return the time - for internal use"""
+        with self._lock:
+            if _check_pid and self._pid != os.getpid():
+                self._reset()
+            if self._ticker is None:
+                # identifies this thread, so a stopped one knows to exit
+                ticker = object()
+                thread = threading.Thread(target=_tick, args=(weakref.ref(self), ticker),
+                                          name="twiggy coarse clock")
+                thread.daemon = True
+                # set the time before the thread can, so it's never None
+                self._now = Timestamp(time.time())
+                self._ticker = ticker
+                self._pid = os.getpid()
+                thread.start()
+            return self._now
+
+    def stop(self):
+        """stop the ticker thread. It's started again by the next call."""
+        with self._lock:
+            self._reset()
+
+    def __repr__(self):
+        return "CoarseClock({0!r})".format(self.resolution)
@@ -1,5 +1,7 @@
 import copy
 
+from .clock import Timestamp
+
 
 def same_value(v):
     """return the value unchanged"""
@@ -23,6 +25,9 @@ class Converter(object):
     :ivar function convert_value: one-argument function to convert the value
     :ivar function convert_item: two-argument function converting the key and converted value
     :ivar bool required: is the item required to present. Items are optional by default.
+
+    `.Timestamp` values are passed to ``convert_value`` as a :class:`time.struct_time`, unless
+    it has a true ``accepts_timestamps`` attribute.
     """
 
     __slots__ = ['key', 'convert_value', 'convert_item', 'required']
@@ -33,6 +38,13 @@ class Converter(object):
         self.convert_item = convert_item
         self.required = required
 
+    #: bumped whenever any Converter changes, so tables know their plans may be stale
+    _generation = 0
+
+    def __setattr__(self, name, value):
+        super(Converter, self).__setattr__(name, value)
+        Converter._generation += 1
+
     def __repr__(self):
         # XXX perhaps poke around in convert_value/convert_item to see if we can extract
         # a meaningful `"some_string".format`? eh.
@@ -40,7 +52,20 @@ class Converter(object):
 
 
 class ConversionTable(list):
-    """Converts dictionaries using Converters"""
+    """Converts dictionaries using Converters
+
+    For each set of keys it sees, the table compiles a plan: the missing required keys, the
+    converters to call in order, and the sorted keys left for `.generic_value` &
+    `.generic_item`. Messages from one call site have the same keys, so plans are nearly always
+    reused. Plans are discarded when the table, its attributes or any `.Converter` change.
+    When `.plan_cache_size` plans are cached, the oldest is evicted.
+
+    As with a `.Converter`, `.generic_value` gets a `.Timestamp` as a struct_time unless it
+    accepts timestamps.
+    """
+
+    #: the maximum number of plans to cache
+    plan_cache_size = 256
 
     def __init__(self, seq=None):
         """
@@ -49,20 +74,27 @@ class ConversionTable(list):
         You may also pass 3-or-4 item arg tuples or kwarg dicts (which will be used to create
         `Converters <.Converter>`)
         """
+        self._plans = {}
+        self._hits = self._misses = 0
 
         super(ConversionTable, self).__init__([])
-        if seq is None:
-            return
-        for i in seq:
-            if isinstance(i, Converter):
-                self.append(i)
-            elif isinstance(i, (tuple, list)) and len(i) in (3, 4):
-                self.add(*i)
-            elif isinstance(i, dict):
-                self.add(**i)
-            else:
-                raise ValueError("Bad converter: {0!r}".format(i))
-        # XXX cache converts & requireds below
+        if seq is not None:
+            for i in seq:
+                if isinstance(i, Converter):
+                    self.append(i)
+                elif isinstance(i, (tuple, list)) and len(i) in (3, 4):
+                    self.add(*i)
+                elif isinstance(i, dict):
+                    self.add(**i)
+                else:
+                    raise ValueError("Bad converter: {0!r}".format(i))
+        # after creating Converters, which bumps it
+        self._generation = Converter._generation
+
+    def __reduce_ex__(self, protocol):
+        # copies & pickles start with no plans, rather than sharing or pickling ours
+        state = dict(self.__dict__, _plans={}, _hits=0, _misses=0)
+        return (self.__class__, (), state, iter(self))
 
     @staticmethod
     def generic_value(value):
@@ -79,34 +111,81 @@ class ConversionTable(list):
         """aggregate the list of converted items"""
         return dict(converteds)
 
+    def __setattr__(self, name, value):
+        super(ConversionTable, self).__setattr__(name, value)
+        if not name.startswith('_'):
+            self._plans.clear()
+
+    def _plan(self, keys):
+        """compile a plan for converting dicts with ``keys`` - for internal use"""
+        converts = set(c.key for c in self)
+        missing = set(c.key for c in self if c.required) - keys
+        if missing:
+            return list(missing), (), (), None, None, None, None
+        steps = tuple((c.key, c.convert_value, c.convert_item, _adapts(c.convert_value))
+                      for c in self if c.key in keys)
+        return (None, steps, tuple(sorted(keys - converts)),
+                self.generic_value, self.generic_item, self.aggregate, _adapts(self.generic_value))
+
     def convert(self, d):
         """do the conversion
 
         :arg dict d: the data to convert. Keys should be strings.
         """
-        # XXX I could be much faster & efficient!
-        # XXX I have written this pattern at least 10 times
-        converts = set(x.key for x in self)
-        avail = set(k for k in d)
-        required = set(x.key for x in self if x.required)
-        missing = required - avail
-
+        plans = self._plans
+        if self._generation != Converter._generation:
+            plans.clear()
+            self._generation = Converter._generation
+
+        keys = frozenset(d)
+        try:
+            plan = plans[keys]
+        except KeyError:
+            self._misses += 1
+            plan = self._plan(keys)
+            while len(plans) >= self.plan_cache_size:
+                for oldest in plans:
+                    break
+                # may have been evicted by another thread already
+                plans.pop(oldest, None)
+            plans[keys] = plan
+        else:
+            self._hits += 1
+
+        missing, steps, generic_keys, generic_value, generic_item, aggregate, adapt_generic = plan
         if missing:
-            raise ValueError("Missing fields {0}".format(list(missing)))
+            raise ValueError("Missing fields {0}".format(missing))
 
         item_list = []
-        for c in self:
-            if c.key in d:
-                item = c.convert_item(c.key, c.convert_value(d[c.key]))
-                if item is not None:
-                    item_list.append(item)
+        for key, convert_value, convert_item, adapt_value in steps:
+            value = d[key]
+            if adapt_value and value.__class__ is Timestamp:
+                value = value.struct_time
+            item = convert_item(key, convert_value(value))
+            if item is not None:
+                item_list.append(item)
 
-        for key in sorted(avail - converts):
-            item = self.generic_item(key, self.generic_value(d[key]))
+        for key in generic_keys:
+            value = d[key]
+            if adapt_generic and value.__class__ is Timestamp:
+                value = value.struct_time
+            item = generic_item(key, generic_value(value))
             if item is not None:
                 item_list.append(item)
 
-        return self.aggregate(item_list)
+        return aggregate(item_list)
+
+    def plan_info(self):
+        """return a dict of plan cache statistics: ``hits``, ``misses``, ``hit_rate``, ``size``
+        & ``maxsize``
+        """
+        hits, misses = self._hits, self._misses
+        lookups = hits + misses
+        return {'hits': hits,
+                'misses': misses,
+                'hit_rate': float(hits) / lookups if lookups else 0.0,
+                'size': len(self._plans),
+                'maxsize': self.plan_cache_size}
 
     def copy(self):
         """make an independent copy of this ConversionTable"""
@@ -136,3 +215,29 @@ class ConversionTable(list):
         # replaces the contents of self. Can't iterate and remove() items at
         # the same time (indexes get messed up.
         self[:] = [c for c in self if c.key != key]
+
+
+def _adapts(convert_value):
+    """should ``convert_value`` get a `.Timestamp` as a struct_time - for internal use"""
+    return not getattr(convert_value, 'accepts_timestamps', False)
+
+
+def _invalidating(name):
+    """wrap the list method ``name`` to discard compiled plans - for internal use"""
+    method = getattr(list, name)
+
+    def invalidate(self, *args, **kwargs):
+        self._plans.clear()
+        return method(self, *args, **kwargs)
+    invalidate.__name__ = name
+    invalidate.__doc__ = method.__doc__
+    return invalidate
+
+
+# every way of changing the list. append() also covers add(), and __setitem__ delete().
+for _name in ('append', 'extend', 'insert', 'remove', 'pop', 'clear', 'sort', 'reverse',
+              '__setitem__', '__delitem__', '__setslice__', '__delslice__', '__iadd__',
+              '__imul__'):
+    if hasattr(list, _name):
+        setattr(ConversionTable, _name, _invalidating(_name))
+del _name
@@ -0,0 +1,161 @@
+"""Helpers for the fields bound to loggers"""
+import os
+import threading
+import weakref
+
+__all__ = ['FieldChain', 'per_process', 'per_thread']
+
+
+class FieldChain(object):
+    """An immutable chain of layers of fields. Later layers override earlier ones.
+
+    Binding fields adds a layer on top of an existing chain, sharing it instead of copying
+    everything bound so far.
+
+    :ivar FieldChain parent: the chain this layer was bound onto, or None
+    :ivar bool shared: True if this chain may be used by several loggers, or has had chains
+        bound onto it, so its flattened dict mustn't be handed out for modification. See
+        `.private`.
+    """
+
+    __slots__ = ['parent', 'shared', '_layer', '_flat']
+
+    def __init__(self, fields=None, parent=None):
+        """
+        :arg dict fields: the fields in this layer. Will be copied.
+        :arg FieldChain parent: the chain to bind onto.
+        """
+        self.parent = parent
+        self.shared = False
+        if parent is not None:
+            # changes to the parent's flattened dict would reach us only until we're flattened
+            parent.shared = True
+        self._layer = dict(fields) if fields else {}
+        self._flat = None
+
+    def private(self):
+        """return a chain whose flattened dict may be modified: ourself, unless we're `.shared`,
+        in which case an empty layer on top of us
+        """
+        return FieldChain(None, self) if self.shared else self
+
+    def flatten(self):
+        """return all fields as a single dict. Do not modify it!
+
+        The dict is computed on the first call and cached. Only layers which get flattened
+        pay for the memory, so intermediate layers stay cheap.
+        """
+        flat = self._flat
+        if flat is not None:
+            return flat
+
+        # walk back to the nearest layer that's already flattened
+        layers = []
+        chain = self
+        while chain is not None and chain._flat is None:
+            layers.append(chain._layer)
+            chain = chain.parent
+
+        flat = chain._flat.copy() if chain is not None else {}
+        for layer in reversed(layers):
+            flat.update(layer)
+        self._flat = flat
+        return flat
+
+    def __repr__(self):
+        return "<FieldChain({0!r})>".format(self.flatten())
+
+
+#
+# Caching callable fields
+#
+# Callables bound as fields are called for every message. Those whose value is fixed for the
+# life of a process or thread can be wrapped with per_process() or per_thread() to only be
+# called once.
+#
+
+# all live _PerProcess, so they can be reset in a forked child
+_per_process = weakref.WeakSet()
+
+# without fork hooks, fall back to comparing pids on every call
+_check_pid = not hasattr(os, 'register_at_fork')
+
+
+def _reset_per_process():
+    """forget values cached by `.per_process` - for internal use"""
+    for f in list(_per_process):
+        f._reset()
+
+
+if not _check_pid:  # pragma: no branch
+    os.register_at_fork(after_in_child=_reset_per_process)
+
+
+class _PerProcess(object):
+    __slots__ = ['func', '_value', '_pid', '__weakref__']
+
+    def __init__(self, func):
+        self.func = func
+        self._pid = None
+        _per_process.add(self)
+
+    def _reset(self):
+        try:
+            del self._value
+        except AttributeError:
+            pass
+
+    def __call__(self):
+        if _check_pid and self._pid != os.getpid():
+            self._reset()
+        try:
+            return self._value
+        except AttributeError:
+            value = self._value = self.func()
+            if _check_pid:
+                self._pid = os.getpid()
+            return value
+
+    def __repr__(self):
+        return "per_process({0!r})".format(self.func)
+
+
+class _PerThread(object):
+    __slots__ = ['func', '_local']
+
+    def __init__(self, func):
+        self.func = func
+        self._local = threading.local()
+
+    def __call__(self):
+        local = self._local
+        try:
+            return local.value
+        except AttributeError:
+            value = local.value = self.func()
+            return value
+
+    def __repr__(self):
+        return "per_thread({0!r})".format(self.func)
+
+
+def per_process(func):
+    """wrap a callable field, so it's only called once per process
+
+    The value is cached, and recomputed in the child after a fork.
+
+    :arg func: a callable taking no arguments
+    :returns: a callable returning the cached value
+    """
+    return _PerProcess(func)
+
+
+def per_thread(func):
+    """wrap a callable field, so it's only called once per thread
+
+    The value is cached in thread-local storage.
+
+    :arg func: a callable taking no arguments
+    :returns: a callable returning the cached value
+    """
+    return _PerThread(func)
@@ -0,0 +1,165 @@
+"""A ring buffer of byte records in shared memory, for passing messages between processes"""
+import os
+import struct
+import time
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # pragma: no cover
+    # Python < 3.8
+    shared_memory = None
+
+__all__ = ['SharedRing']
+
+# layout of the shared block, as indexes of 64 bit counters. The counters only ever increase,
+# and live on separate cache lines so the reader & writer don't contend for them.
+_HEAD = 0  # total bytes written
+_TAIL = 8  # total bytes read
+_CLOSED = 16  # nonzero once the writer is done
+_DATA = 192  # offset in bytes of the records
+
+_length = struct.Struct('=I')
+
+
+class SharedRing(object):
+    """A single-producer, single-consumer ring of byte records in shared memory
+
+    The writer only updates the head counter, and the reader only the tail, so neither takes a
+    lock. A record is published by advancing the head after its bytes are copied in. Nothing
+    but program order keeps the copy ahead of the head store, so this relies on CPython, which
+    doesn't reorder them, and a strongly ordered CPU such as x86; weakly ordered ones such as
+    ARM may let the reader see the new head before the bytes. Only one thread may `.put` at a
+    time, and one `.get`; callers with several writers must serialize them.
+
+    Requires :mod:`multiprocessing.shared_memory` (Python 3.8+).
+
+    :ivar int size: bytes of records the ring can hold
+    :ivar str name: the name of the shared memory block
+    """
+
+    def __init__(self, size=1 << 22, name=None):
+        """
+        :arg int size: bytes of records the ring can hold, including a 4 byte length per record
+        :arg str name: the name of an existing ring to attach to. If None, create a new one.
+        :raises NotImplementedError: if shared memory isn't available
+        """
+        if shared_memory is None:  # pragma: no cover
+            raise NotImplementedError("SharedRing requires multiprocessing.shared_memory")
+
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=_DATA + size)
+            self._shm.buf[:_DATA] = bytes(_DATA)
+            # unlink in the creating process only, not in forked children
+            self._owner_pid = os.getpid()
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self._owner_pid = None
+        self.size = size
+        self.name = self._shm.name
+        self._buf = self._shm.buf
+        # an item of a memoryview is read & written with a single aligned access, so the other
+        # process can't see half an update, as it could with struct.pack_into
+        self._counters = self._buf[:_DATA].cast('Q')
+        # each side caches its own counter, which nobody else changes
+        self._head = self._counters[_HEAD]
+        self._tail = self._counters[_TAIL]
+
+    def __reduce__(self):
+        # attach by name, for spawned processes
+        return (self.__class__, (self.size, self.name))
+
+    def _copy_in(self, pos, data):
+        offset = pos % self.size
+        first = min(len(data), self.size - offset)
+        start = _DATA + offset
+        self._buf[start:start + first] = data[:first]
+        if first < len(data):
+            self._buf[_DATA:_DATA + len(data) - first] = data[first:]
+
+    def _copy_out(self, pos, n):
+        offset = pos % self.size
+        first = min(n, self.size - offset)
+        start = _DATA + offset
+        data = bytes(self._buf[start:start + first])
+        if first < n:
+            data += bytes(self._buf[_DATA:_DATA + n - first])
+        return data
+
+    def put(self, data):
+        """append a record
+
+        :arg bytes data: the record
+        :returns: False if there isn't room for it, True otherwise
+        :raises ValueError: if the record could never fit
+        """
+        needed = _length.size + len(data)
+        if needed > self.size:
+            raise ValueError("record of {0} bytes can't fit in ring of {1}".format(
+                len(data), self.size))
+
+        head = self._head
+        if needed > self.size - (head - self._counters[_TAIL]):
+            return False
+        self._copy_in(head, _length.pack(len(data)))
+        self._copy_in(head + _length.size, data)
+        # publish it
+        head = self._head = head + needed
+        self._counters[_HEAD] = head
+        return True
+
+    def get(self):
+        """remove the oldest record
+
+        :returns: the record's bytes, or None if the ring is empty
+        """
+        tail = self._tail
+        if tail == self._counters[_HEAD]:
+            return None
+        n = _length.unpack(self._copy_out(tail, _length.size))[0]
+        data = self._copy_out(tail + _length.size, n)
+        # free the space
+        tail = self._tail = tail + _length.size + n
+        self._counters[_TAIL] = tail
+        return data
+
+    def __len__(self):
+        """bytes currently used by records"""
+        return self._counters[_HEAD] - self._counters[_TAIL]
+
+    def wait(self, timeout=None):
+        """wait until there's a record to `.get`, or the writer has closed
+
+        There's no cheap way to signal across processes without a lock, so this polls, backing
+        off from yielding to sleeping up to a millisecond.
+
+        :arg float timeout: seconds to wait for, or None to wait forever
+        :returns: True if there's a record, False otherwise
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        delay = 0
+        while self._tail == self._counters[_HEAD]:
+            if self.writer_closed:
+                # a record may have been published just before closing
+                return self._tail != self._counters[_HEAD]
+            if deadline is not None and time.time() >= deadline:
+                return False
+            time.sleep(delay)
+            delay = min(delay * 2 or 0.00005, 0.001)
+        return True
+
+    @property
+    def writer_closed(self):
+        """has the writer called `.close_writer`"""
+        return self._counters[_CLOSED] != 0
+
+    def close_writer(self):
+        """tell the reader there will be no more records"""
+        self._counters[_CLOSED] = 1
+
+    def close(self):
+        """release the shared memory. The creating process also destroys it."""
+        self._counters.release()
+        self._buf = self._counters = None
+        self._shm.close()
+        if self._owner_pid == os.getpid():
+            self._shm.unlink()
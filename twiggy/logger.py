@@ -1,18 +1,18 @@
 from __future__ import print_function
 
 import sys
-import time
 import traceback
 import warnings
 from functools import wraps
 
-from six import iteritems
-
+from . import filters
 from . import formats
 from . import levels
 from . import outputs
 from .lib import iso8601time
-from .message import Message
+from .lib import clock
+from .lib.fields import FieldChain
+from .message import Message, Options
 
 
 def emit(level):
@@ -40,24 +40,72 @@ emit.error = emit(levels.ERROR)
 emit.critical = emit(levels.CRITICAL)
 
 
+def _disabled(*args, **kwargs):
+    """a level method for a level that can't be emitted - for internal use"""
+    pass
+
+
+def _disabled_notice(*args, **kwargs):
+    """`._disabled`, returning True like `.BaseLogger.notice` - for internal use"""
+    return True
+
+
+# (level, method name, no-op) for the methods which emit at a level
+_level_methods = ((levels.DEBUG, 'debug', _disabled),
+                  (levels.INFO, 'info', _disabled),
+                  (levels.NOTICE, 'notice', _disabled_notice),
+                  (levels.WARNING, 'warning', _disabled),
+                  (levels.ERROR, 'error', _disabled),
+                  (levels.CRITICAL, 'critical', _disabled))
+
+
+_default_options = Options(**Message._default_options)
+
+
 class BaseLogger(object):
     """Base class for loggers"""
 
-    __slots__ = ['_fields', '_options', 'min_level']
+    __slots__ = ['_field_chain', '_options', '_min_level']
 
     __valid_options = set(Message._default_options)
 
     def __init__(self, fields=None, options=None, min_level=None):
         """Constructor for internal module use only, basically.
 
-        ``fields`` and ``options`` will be copied.
+        ``fields`` will be copied. It may also be a `.FieldChain`, which will be used as is.
+        ``options`` may be a dict or an `.Options`.
         """
-        self._fields = fields.copy() if fields is not None else {}
-        self._options = options.copy() if options is not None else Message._default_options.copy()
+        if isinstance(fields, FieldChain):
+            self._field_chain = fields
+        else:
+            self._field_chain = FieldChain(fields)
+        self._options = Options.coerce(options) if options is not None else _default_options
         self.min_level = min_level if min_level is not None else levels.DEBUG
 
-    def _clone(self):
-        return self.__class__(fields=self._fields, options=self._options, min_level=self.min_level)
+    @property
+    def _fields(self):
+        """dict of all bound fields
+
+        Flattened from the `.FieldChain` when first needed. Changes to it affect this logger,
+        and those cloned from it afterwards.
+        """
+        # don't let changes leak to other loggers sharing our chain
+        chain = self._field_chain = self._field_chain.private()
+        return chain.flatten()
+
+    @property
+    def min_level(self):
+        """minimum `.LogLevel` for which to emit. For optimization purposes only."""
+        return self._min_level
+
+    @min_level.setter
+    def min_level(self, level):
+        self._min_level = level
+
+    def _clone(self, fields=None):
+        """return a new instance, with ``fields`` bound on top of ours"""
+        return self.__class__(fields=FieldChain(fields, self._field_chain),
+                              options=self._options, min_level=self.min_level)
 
     def _emit(self, level, format_spec, args, kwargs):
         raise NotImplementedError
@@ -74,17 +122,17 @@ class BaseLogger(object):
 
         Use this instead of `.fields` if you have keys which are not valid Python identifiers.
         """
-        clone = self._clone()
-        clone._fields.update(d)
-        return clone
+        return self._clone(d)
 
     def options(self, **kwargs):
         """bind option for message creation."""
         bad_options = set(kwargs) - self.__valid_options
         if bad_options:
             raise ValueError("Invalid options {0!r}".format(tuple(bad_options)))
+        # validate now, rather than for every message
+        options = self._options.replace(**kwargs)
         clone = self._clone()
-        clone._options.update(kwargs)
+        clone._options = options
         return clone
 
     #
@@ -142,9 +190,10 @@ class InternalLogger(BaseLogger):
         super(InternalLogger, self).__init__(fields, options, min_level)
         self.output = output
 
-    def _clone(self):
-        return self.__class__(fields=self._fields, options=self._options,
-                              min_level=self.min_level, output=self.output)
+    def _clone(self, fields=None):
+        return self.__class__(fields=FieldChain(fields, self._field_chain),
+                              options=self._options, min_level=self.min_level,
+                              output=self.output)
 
     def _emit(self, level, format_spec, args, kwargs):
         """does work of emitting - for internal use"""
@@ -153,8 +202,8 @@ class InternalLogger(BaseLogger):
             return
         try:
             try:
-                msg = Message(level, format_spec, self._fields.copy(), self._options.copy(),
-                              args, kwargs)
+                msg = Message(level, format_spec, self._field_chain.flatten().copy(),
+                              self._options, args, kwargs)
             except Exception:
                 msg = None
                 raise
@@ -168,9 +217,27 @@ class InternalLogger(BaseLogger):
 
 
 class Logger(BaseLogger):
-    """Logger for end-users"""
+    """Logger for end-users
+
+    Each Logger is an instance of a subclass specialized for its ``min_level`` and emitters, in
+    which the methods for levels that can't be emitted are no-ops. The specializations are kept
+    up to date as the emitters change; see `._specialize`. Clones share their parent's
+    specialized class, so only setting ``min_level`` switches classes.
 
-    __slots__ = ['_emitters', 'filter']
+    Once a Logger has been asked for a second child by `.name`, the fields bound for each name
+    are cached, so that calling ``log.name('x')`` inline doesn't bind them again. Each call
+    still returns a new Logger.
+    """
+
+    __slots__ = ['_emitters', 'filter', '_name_chains']
+
+    #: the maximum number of names to cache bound fields for
+    child_cache_size = 128
+
+    #: for specialized subclasses, the class they specialize - for internal use
+    _unspecialized = None
+    #: for specialized subclasses, the ``min_level._value`` they are specialized for
+    _specialized_min_value = 0
 
     def _feature_noop(self, *args, **kwargs):
         return self._clone()
@@ -184,6 +251,7 @@ class Logger(BaseLogger):
         """
         warnings.warn("Use of features is currently discouraged, pending refactoring",
                       RuntimeWarning)
+        cls = cls._unspecialized or cls
         name = name if name is not None else func.__name__
         setattr(cls, name, func)
 
@@ -197,8 +265,9 @@ class Logger(BaseLogger):
         """
         warnings.warn("Use of features is currently discouraged, pending refactoring",
                       RuntimeWarning)
+        cls = cls._unspecialized or cls
         # get func directly from class dict - we don't want an unbound method.
-        setattr(cls, name, cls.__dict__['_feature_noop'])
+        setattr(cls, name, Logger.__dict__['_feature_noop'])
 
     @classmethod
     def delFeature(cls, name):
@@ -208,23 +277,128 @@ class Logger(BaseLogger):
         """
         warnings.warn("Use of features is currently discouraged, pending refactoring",
                       RuntimeWarning)
+        cls = cls._unspecialized or cls
         delattr(cls, name)
 
     def __init__(self, fields=None, options=None, emitters=None,
                  min_level=None, filter=None):
-        super(Logger, self).__init__(fields, options, min_level)
         #: a dict of emitters
-        self._emitters = emitters if emitters is not None else {}
+        if emitters is None:
+            emitters = filters.EmitterDict()
+        elif not isinstance(emitters, filters.EmitterDict):
+            warnings.warn("emitters should be an EmitterDict; this dict is copied, so later "
+                          "changes to it won't affect the Logger", RuntimeWarning, stacklevel=2)
+            emitters = filters.EmitterDict(emitters)
+        self._emitters = emitters
+        self._name_chains = None
         self.filter = filter if filter is not None else lambda format_spec: True
+        # sets min_level last, which specializes us
+        super(Logger, self).__init__(fields, options, min_level)
 
-    def _clone(self):
-        """return a new Logger instance with copied attributes
+    @property
+    def _fields(self):
+        """dict of all bound fields, as for `.BaseLogger`.
+
+        Forgets the fields cached for children by `.name`, as they may be about to change.
+        """
+        if self._name_chains:
+            self._name_chains = {}
+        return BaseLogger._fields.fget(self)
+
+    @BaseLogger.min_level.setter
+    def min_level(self, level):
+        self._min_level = level
+        self._specialize()
+
+    def _specialize(self):
+        """switch to the subclass specialized for our ``min_level`` & emitters - for internal use
+
+        The subclasses are kept in the emitters' ``_dependents``, which tells them when the
+        emitters change, via `._emitters_changed`.
+        """
+        cls = self.__class__
+        base = cls._unspecialized or cls
+        min_value = self._min_level._value
+        dependents = self._emitters._dependents
+        try:
+            specialized = dependents[base, min_value]
+        except KeyError:
+            specialized = type(base)(base.__name__, (base, ),
+                                     {'__slots__': (),
+                                      '__module__': base.__module__,
+                                      '__doc__': base.__doc__,
+                                      '_unspecialized': base,
+                                      '_specialized_min_value': min_value})
+            specialized._emitters_changed(self._emitters)
+            specialized = dependents.setdefault((base, min_value), specialized)
+
+        if cls is not specialized:
+            self.__class__ = specialized
+
+    @classmethod
+    def _emitters_changed(cls, emitters):
+        """make level methods no-ops for levels below our ``min_level`` or the lowest level
+        ``emitters`` will accept - for internal use
+        """
+        threshold = max(cls._specialized_min_value, emitters._min_value)
+        for level, name, disabled in _level_methods:
+            if level._value < threshold:
+                # a staticmethod, so there's not even a bound method to create
+                setattr(cls, name, staticmethod(disabled))
+            else:
+                try:
+                    delattr(cls, name)
+                except AttributeError:
+                    # not disabled, or another thread got here first
+                    pass
+
+    def _clone(self, fields=None):
+        """return a new Logger instance with copied attributes, and ``fields`` bound
 
         Probably only for internal use.
         """
-        return self.__class__(fields=self._fields, options=self._options,
-                              emitters=self._emitters, min_level=self.min_level,
-                              filter=self.filter)
+        return self._clone_chain(FieldChain(fields, self._field_chain))
+
+    def _clone_chain(self, chain):
+        """return a new Logger instance with copied attributes, using ``chain`` for its fields
+        - for internal use
+        """
+        # we're already the class specialized for our min_level & emitters, so skip __init__
+        # & the property setters
+        clone = object.__new__(self.__class__)
+        clone._field_chain = chain
+        clone._options = self._options
+        clone._min_level = self._min_level
+        clone._emitters = self._emitters
+        clone.filter = self.filter
+        clone._name_chains = None
+        return clone
+
+    def name(self, name):
+        """convenvience method to bind ``name`` field"""
+        name_chains = self._name_chains
+        if name_chains is None:
+            # don't cache for loggers only asked for one child, like per-request ones
+            self._name_chains = {}
+            return self._clone({'name': name})
+
+        # include the type, as values like 1 and True are equal but format differently
+        key = (name.__class__, name)
+        try:
+            chain = name_chains[key]
+        except KeyError:
+            chain = FieldChain({'name': name}, self._field_chain)
+            chain.shared = True
+            if len(name_chains) >= self.child_cache_size:
+                # evict the oldest
+                for oldest in name_chains:
+                    break
+                name_chains.pop(oldest, None)
+            name_chains[key] = chain
+        except TypeError:
+            # unhashable
+            return self._clone({'name': name})
+        return self._clone_chain(chain)
 
     @emit.info
     def struct(self, **kwargs):
@@ -249,8 +423,12 @@ class Logger(BaseLogger):
     def _emit(self, level, format_spec, args, kwargs):
         """does the work of emitting - for internal use"""
 
+        # nobody wants this message. Plain int comparisons are much cheaper than LogLevel's.
+        if level._value < self._emitters._min_value:
+            return
+
         # XXX should these traps be collapsed?
-        if level < self.min_level:
+        if level._value < self.min_level._value:
             return
 
         try:
@@ -261,17 +439,19 @@ class Logger(BaseLogger):
                               repr(self.filter), format_spec)
             # just continue emitting in face of filter error
 
-            # XXX should we trap here too b/c of "Dictionary changed size during iteration" (or
-            # other rare errors?)
-        potential_emitters = [(name, emitter) for name, emitter in iteritems(self._emitters)
-                              if level >= emitter.min_level]
+        emitters = self._emitters
+        if emitters._compiled_version == emitters._version:
+            dispatch = emitters._dispatch
+        else:
+            dispatch = emitters._compile()
+        selected = dispatch[level]
 
-        if not potential_emitters:
+        if not selected:
             return
 
         try:
-            msg = Message(level, format_spec, self._fields.copy(), self._options.copy(),
-                          args, kwargs)
+            msg = Message(level, format_spec, self._field_chain.flatten().copy(),
+                          self._options, args, kwargs)
         except Exception:
             # XXX use .fields() instead?
             internal_log.info("Error formatting message level: {0!r}, format: {1!r},"
@@ -279,19 +459,23 @@ class Logger(BaseLogger):
                               level, format_spec, self._fields, self._options, args, kwargs)
             return
 
-        outputs = set()
-        # sort to make things deterministic (for tests, mainly)
-        for name, emitter in sorted(potential_emitters):
+        # name-only filters have already been decided for names we've seen
+        always, selected = emitters._name_dispatch_for(level, selected, msg)
+        outputs = set(always)
+        for name, filter_, output in selected:
             try:
-                include = emitter.filter(msg)
+                include = filter_(msg)
             except Exception:
                 internal_log.info("Error filtering with emitter {0}. Filter: {1}"
-                                  " Message: {2!r}", name, repr(emitter.filter), msg)
+                                  " Message: {2!r}", name, repr(filter_), msg)
                 include = True  # output anyway if error
 
             if include:
-                outputs.add(emitter._output)
+                outputs.add(output)
 
+        if len(outputs) > 1:
+            # format once for outputs sharing a format
+            msg._formats = {}
         for o in outputs:
             try:
                 o.output(msg)
@@ -299,7 +483,7 @@ class Logger(BaseLogger):
                 internal_log.warning("Error outputting with {0!r}. Message: {1!r}", o, msg)
 
 
-__fields = {'time': time.gmtime}
+__fields = {'time': clock.now}
 __internal_format = formats.LineFormat(conversion=formats.line_conversion)
 __internal_output = outputs.StreamOutput(format=__internal_format, stream=sys.stderr)
 
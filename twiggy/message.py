@@ -1,18 +1,311 @@
+import calendar
+import marshal
 import sys
+import time
 import traceback
 from string import Template
 
-from six import iteritems
+from six import PY3, binary_type, iteritems, text_type
 
+from .levels import LogLevel
+from .lib.clock import Timestamp
 from .lib.text import to_text
 
-__all__ = ['Message']
+__all__ = ['Message', 'Options', 'RendererCache', 'renderers']
+
+
+def _compile_dollar(format_spec):
+    # split into literal text and the names to substitute, as Template.substitute does
+    literals, names = [], []
+    literal = ''
+    start = 0
+    for match in Template.pattern.finditer(format_spec):
+        if match.group('invalid') is not None:
+            # let Template raise when rendering
+            substitute = Template(format_spec).substitute
+
+            def render_invalid(*args, **kwargs):
+                return substitute(kwargs)
+            return render_invalid
+
+        literal += format_spec[start:match.start()]
+        start = match.end()
+        if match.group('escaped') is not None:
+            literal += Template.delimiter
+        else:
+            literals.append(literal)
+            literal = ''
+            names.append(match.group('named') or match.group('braced'))
+    literals.append(literal + format_spec[start:])
+
+    first = literals[0]
+    if not names:
+        def render_literal(*args, **kwargs):
+            return first
+        return render_literal
+
+    rest = list(zip(names, literals[1:]))
+
+    def render_dollar(*args, **kwargs):
+        parts = [first]
+        for name, literal in rest:
+            parts.append('%s' % (kwargs[name], ))
+            parts.append(literal)
+        return ''.join(parts)
+    return render_dollar
+
+
+class RendererCache(object):
+    """A bounded cache of renderers for format specs
+
+    A renderer is a function ``render(*args, **kwargs)`` which substitutes into a particular
+    ``format_spec``. Log calls use a small set of literal format specs, so compiling each of them
+    once saves parsing them for every message.
+
+    Only ``dollar`` specs are compiled: :class:`string.Template` parses with a regex for every
+    substitution, while ``str.format`` and ``%`` parse faster than a cache lookup.
+
+    When a style has ``maxsize`` renderers, the oldest is evicted. This is first-in, first-out
+    rather than least-recently-used, as reordering on every hit would cost more than it saves.
+
+    :ivar int maxsize: the maximum number of renderers to cache for each style
+    :ivar int hits: number of lookups which found a cached renderer
+    :ivar int misses: number of lookups which compiled a new renderer
+    """
+
+    compilers = {'dollar': _compile_dollar}
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self._renderers = dict((style, {}) for style in self.compilers)
+        self.hits = self.misses = 0
+
+    def get(self, style, format_spec):
+        """return a renderer for ``format_spec``
+
+        :arg string style: a normalized style in `.compilers`; only ``dollar``
+        """
+        renderers = self._renderers[style]
+        try:
+            renderer = renderers[format_spec]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            return renderer
+
+        self.misses += 1
+        renderer = self.compilers[style](format_spec)
+        while len(renderers) >= self.maxsize:
+            for oldest in renderers:
+                break
+            # may have been evicted by another thread already
+            renderers.pop(oldest, None)
+        renderers[format_spec] = renderer
+        return renderer
+
+    def info(self):
+        """return a dict of cache statistics: ``hits``, ``misses``, ``hit_rate``, ``size`` &
+        ``maxsize``
+        """
+        hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {'hits': hits,
+                'misses': misses,
+                'hit_rate': float(hits) / lookups if lookups else 0.0,
+                'size': sum(len(r) for r in self._renderers.values()),
+                'maxsize': self.maxsize}
+
+    def clear(self):
+        """empty the cache and reset statistics"""
+        for renderers in self._renderers.values():
+            renderers.clear()
+        self.hits = self.misses = 0
+
+
+#: the `.RendererCache` used by `.Message`
+renderers = RendererCache()
+
+
+# % and str.format parse as fast as we could look up a renderer
+def _render_percent(format_spec, args, kwargs):
+    return format_spec % (args or kwargs)
+
+
+def _render_braces(format_spec, args, kwargs):
+    return format_spec.format(*args, **kwargs)
+
+
+def _render_dollar(format_spec, args, kwargs):
+    return renderers.get('dollar', format_spec)(*args, **kwargs)
+
+
+class Options(object):
+    """Validated, immutable :ref:`options <message-options>` for creating `Messages <.Message>`
+
+    Loggers create these when options are bound, so that messages don't need to validate or
+    normalize them. Items may be read like a dict's: ``options['style']``.
+    """
+
+    __slots__ = ['suppress_newlines', 'trace', 'style', '_render', '_traceback']
+
+    _style_aliases = {'braces': 'braces', 'dollar': 'dollar',
+                      'percent': 'percent', '{}': 'braces', '$': 'dollar',
+                      '%': 'percent'}
+
+    _renders = {'braces': _render_braces,
+                'dollar': _render_dollar,
+                'percent': _render_percent}
+
+    def __init__(self, suppress_newlines=True, trace=None, style='braces'):
+        """
+        :raises ValueError: for a bad ``trace`` or ``style``
+        """
+        try:
+            style = self._style_aliases[style]
+        except (KeyError, TypeError):
+            raise ValueError("Bad format spec style {0!r}".format(style))
+
+        if isinstance(trace, tuple) and len(trace) == 3:
+            # the same for every message, so format it now
+            tb = "\n".join(traceback.format_exception(*trace))
+        elif trace == "always":
+            raise NotImplementedError
+            # XXX build a traceback using getframe
+            # XXX maybe an option to just provide current frame info instead of full stack?
+        elif trace is not None and trace != "error":
+            raise ValueError("bad trace {0!r}".format(trace))
+        else:
+            tb = None
+
+        set_ = super(Options, self).__setattr__
+        set_('suppress_newlines', suppress_newlines)
+        set_('trace', trace)
+        set_('style', style)
+        set_('_render', self._renders[style])
+        set_('_traceback', tb)
+
+    @classmethod
+    def coerce(cls, options):
+        """return ``options`` as an Options. It may be an Options or a dict."""
+        if isinstance(options, cls):
+            return options
+        return cls(**options)
+
+    def replace(self, **kwargs):
+        """return a new Options, with ``kwargs`` replacing our values"""
+        d = self.as_dict()
+        d.update(kwargs)
+        return self.__class__(**d)
+
+    def as_dict(self):
+        """return our values as a dict"""
+        return {'suppress_newlines': self.suppress_newlines,
+                'trace': self.trace,
+                'style': self.style}
+
+    def __getitem__(self, key):
+        if key not in Message._default_options:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Options are immutable")
+
+    def __eq__(self, other):
+        if not isinstance(other, Options):
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    def __hash__(self):
+        return hash((self.suppress_newlines, self.trace, self.style))
+
+    def __repr__(self):
+        return "<Options(suppress_newlines={0!r}, trace={1!r}, style={2!r})>".format(
+            self.suppress_newlines, self.trace, self.style)
+
+    def __getstate__(self):
+        return self.as_dict()
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+
+#
+# Compact encoding
+#
+# Messages are encoded with marshal, which is fast, compact, and can't run code when loading,
+# unlike pickle. Field keys twiggy itself binds are sent as small ints, and non-string keys in
+# a 1-tuple. Values marshal can't represent exactly are tagged with a small int in a tuple.
+#
+
+_codec_version = 3
+
+#: field keys encoded as their index
+_interned_keys = ('time', 'level', 'name', 'hostname', 'pid', 'thread',
+                  'ip_addr', 'port', 'host', 'service')
+_key_indexes = dict((key, i) for i, key in enumerate(_interned_keys))
+# keys sent as themselves. Any others are sent in a 1-tuple.
+_string_keys = frozenset((text_type, str))
+
+# tags for values marshal doesn't do
+_LEVEL, _GMTIME, _STRUCT_TIME, _TIMESTAMP = 0, 1, 2, 3
+
+# types marshal round-trips exactly. Subclasses (like bool, which is safe) are checked by exact
+# type, so they don't come back as their base.
+_marshal_types = frozenset((type(None), bool, int, float, text_type, binary_type))
+if not PY3:  # pragma: no py3 cover
+    _marshal_types |= frozenset((long, ))  # noqa: F821
+
+
+def _encode_value(v):
+    cls = v.__class__
+    if cls in _marshal_types:
+        return v
+    elif cls is LogLevel:
+        return (_LEVEL, v._value)
+    elif cls is Timestamp:
+        return (_TIMESTAMP, float(v))
+    elif cls is time.struct_time:
+        if getattr(v, 'tm_gmtoff', None) == 0:
+            # from time.gmtime, so a float is enough
+            return (_GMTIME, float(calendar.timegm(v)))
+        return (_STRUCT_TIME, tuple(v))
+    else:
+        # whatever formats would make of it
+        return text_type(v)
+
+
+_levels_by_value = None
+
+
+def _decode_value(v):
+    if v.__class__ is not tuple:
+        return v
+    global _levels_by_value
+    tag, value = v
+    if tag == _LEVEL:
+        if _levels_by_value is None:
+            _levels_by_value = dict((level._value, level)
+                                    for level in LogLevel._name2levels.values())
+        return _levels_by_value[value]
+    elif tag == _TIMESTAMP:
+        return Timestamp(value)
+    elif tag == _GMTIME:
+        return time.gmtime(value)
+    else:
+        return time.struct_time(value)
 
 
 class Message(object):
     """A log message.  All attributes are read-only."""
 
-    __slots__ = ['fields', 'suppress_newlines', 'traceback', 'text']
+    __slots__ = ['fields', 'suppress_newlines', 'traceback', '_text',
+                 '_format_spec', '_options', '_args', '_kwargs', '_formats']
 
     #: default option values. Don't change these!
     _default_options = {'suppress_newlines': True,
@@ -29,49 +322,27 @@ class Message(object):
         :arg dict fields: dictionary of fields for :ref:`structured logging <structured-logging>`
         :arg tuple args: substitution arguments for ``format_spec``.
         :arg dict kwargs: substitution keyword arguments for ``format_spec``.
-        :arg dict options: a dictionary of :ref:`options <message-options>` to control message
-            creation.
+        :arg Options options: `.Options` to control message creation. May also be a dict of
+            :ref:`options <message-options>`.
         """
         format_spec = to_text(format_spec, errors='surrogate_or_replace')
+        options = Options.coerce(options)
 
         self.fields = fields
-        self.suppress_newlines = options['suppress_newlines']
+        self.suppress_newlines = options.suppress_newlines
         self.fields['level'] = level
+        self._formats = None
 
-        # format traceback
-        # XXX this needs some cleanup/branch consolidation
-        trace = options['trace']
-        if isinstance(trace, tuple) and len(trace) == 3:
-            self.traceback = "\n".join(traceback.format_exception(*trace))
-        elif trace == "error":
+        if options.trace == "error":
             tb = sys.exc_info()
             if tb[0] is None:
                 self.traceback = None
             else:
                 self.traceback = traceback.format_exc()
-        elif trace == "always":
-            raise NotImplementedError
-            # XXX build a traceback using getframe
-            # XXX maybe an option to just provide current frame info instead of full stack?
-        elif trace is not None:
-            raise ValueError("bad trace {0!r}".format(trace))
         else:
-            self.traceback = None
+            self.traceback = options._traceback
 
-        style = options['style']
-
-        style_aliases = {'braces': 'braces', 'dollar': 'dollar',
-                         'percent': 'percent', '{}': 'braces', '$': 'dollar',
-                         '%': 'percent'}
-        try:
-            style = style_aliases[style]
-        except KeyError:
-            raise ValueError("Bad format spec style {0!r}".format(style))
-
-        # Populate `text` by calling callables in `fields`, `args` and `kwargs`,
-        # and substituting into `format_spec`.
-
-        # call any callables
+        # call any callables now, so their values are those at the time of logging
         for k, v in iteritems(fields):
             if callable(v):
                 fields[k] = v()
@@ -82,27 +353,114 @@ class Message(object):
 
         args = tuple(v() if callable(v) else v for v in args)
 
-        # substitute
+        # these are cheap to check, so do it now
+        style = options.style
+        if style == 'percent' and args and kwargs:
+            raise ValueError("can't have both args & kwargs with % style format specs")
+        elif style == 'dollar' and args:
+            raise ValueError("can't use args with $ style format specs")
+
+        # `text` is only substituted when first needed - see _render()
         if format_spec == '':
-            self.text = ''
-            return
-
-        if style == 'braces':
-            s = format_spec.format(*args, **kwargs)
-        elif style == 'percent':
-            # a % style format
-            if args and kwargs:
-                raise ValueError("can't have both args & kwargs with % style format specs")
-            else:
-                s = format_spec % (args or kwargs)
-        elif style == 'dollar':
-            if args:
-                raise ValueError("can't use args with $ style format specs")
-            s = Template(format_spec).substitute(kwargs)
+            self._text = ''
         else:
-            assert False, "impossible style"
+            self._text = None
+            self._format_spec = format_spec
+            self._options = options
+            self._args = args
+            self._kwargs = kwargs
+
+    @property
+    def text(self):
+        """the human-readable message, substituted on first access"""
+        text = self._text
+        if text is None:
+            text = self._text = self._render()
+        return text
+
+    def _render(self):
+        """substitute ``args``/``kwargs`` into ``format_spec`` - for internal use
+
+        Errors are reported to `.internal_log`, and the unsubstituted ``format_spec`` is used.
+        """
+        format_spec, args, kwargs = self._format_spec, self._args, self._kwargs
+        try:
+            return self._options._render(format_spec, args, kwargs)
+        except Exception:
+            # import here to avoid a circular import
+            from .logger import internal_log
+            # repr() now, so that internal_log can't fail the same way
+            internal_log.info("Error formatting message text, format: {0!r}, args: {1},"
+                              " kwargs: {2}", format_spec, repr(args), repr(kwargs))
+            return format_spec
 
-        self.text = s
+    def encode(self):
+        """return the message as compact bytes, for sending to another process. Much smaller
+        and faster than pickling. See `.decode`.
+
+        Field values other than strings, numbers, None, `LogLevels <.LogLevel>` and
+        :class:`time.struct_time` are converted to text.
+        """
+        items = []
+        for k, v in iteritems(self.fields):
+            if k.__class__ in _string_keys:
+                items.append(_key_indexes.get(k, k))
+            else:
+                # so other keys, such as ints, can't be mistaken for an index
+                items.append((k, ))
+            items.append(_encode_value(v))
+        return marshal.dumps((_codec_version, self.text, self.traceback, self.suppress_newlines,
+                              tuple(items)))
+
+    @classmethod
+    def decode(cls, data):
+        """return a new Message from bytes returned by `.encode`"""
+        version, text, tb, suppress_newlines, items = marshal.loads(data)
+        if version != _codec_version:
+            raise ValueError("Unknown message encoding version {0!r}".format(version))
+
+        fields = {}
+        for i in range(0, len(items), 2):
+            k = items[i]
+            if k.__class__ is int:
+                k = _interned_keys[k]
+            elif k.__class__ is tuple:
+                k = k[0]
+            fields[k] = _decode_value(items[i + 1])
+
+        msg = cls.__new__(cls)
+        msg.fields = fields
+        msg.suppress_newlines = suppress_newlines
+        msg.traceback = tb
+        msg._text = text
+        msg._formats = None
+        return msg
+
+    def __getstate__(self):
+        # substitute before pickling, so args & kwargs needn't be picklable
+        return self.fields, self.suppress_newlines, self.traceback, self.text
+
+    def __setstate__(self, state):
+        self.fields, self.suppress_newlines, self.traceback, self._text = state
+        self._formats = None
+
+    def _format_with(self, format):
+        """return ``format(self)`` - for internal use
+
+        Once `.Logger` has found a message is going to several outputs, results are kept by
+        format, so that outputs sharing a format share its result.
+        """
+        formats = self._formats
+        if formats is None:
+            return format(self)
+        try:
+            return formats[format]
+        except KeyError:
+            x = formats[format] = format(self)
+            return x
+        except TypeError:
+            # unhashable
+            return format(self)
 
     @property
     def name(self):
@@ -1,8 +1,31 @@
+import collections
+import gzip
+import mmap
 import multiprocessing
+import os
+import re
+import shutil
+import socket
 import threading
 import sys
+import time
 import atexit
 
+from six import binary_type, text_type
+from six.moves.queue import Empty, Full, Queue
+
+try:
+    import lzma
+except ImportError:  # pragma: no cover
+    # Python 2
+    lzma = None
+
+from .lib.ring import SharedRing
+from .message import Message
+
+# tells a writer thread to stop
+_SHUTDOWN = object()
+
 
 class Output(object):
     """Does the work of formatting and writing a message."""
@@ -52,23 +75,73 @@ class Output(object):
         """
         raise NotImplementedError
 
+    def _write_batch(self, xs):
+        """Write several formatted messages at once. Used by asynchronous outputs.
+
+        Subclasses may override this to coalesce writes; by default, calls `._write` for each.
+
+        :arg list xs: implementation-dependent objects to be written, in order.
+        """
+        for x in xs:
+            self._write(x)
+
     def __sync_output_locked(self, msg):
-        x = self._format(msg)
+        x = msg._format_with(self._format)
         with self._lock:
             self._write(x)
 
     def __sync_output_unlocked(self, msg):
-        x = self._format(msg)
+        x = msg._format_with(self._format)
         self._write(x)
 
 
 class AsyncOutput(Output):
     """An `.Output` with support for asynchronous logging"""
 
-    def __init__(self, format=None, msg_buffer=0, close_atexit=True):
+    #: supported values of ``async_mode``
+    async_modes = ('process', 'thread', 'shared_memory')
+
+    #: supported values of ``overflow``
+    overflow_policies = ('block', 'drop_newest', 'drop_oldest', 'drop_below')
+
+    #: bytes of formatted messages buffered by the ``shared_memory`` mode
+    ring_size = 1 << 22
+
+    #: minimum seconds between reports of dropped messages to `.internal_log`
+    drop_report_interval = 10
+
+    def __init__(self, format=None, msg_buffer=0, close_atexit=True, async_mode='process',
+                 batch_size=64, linger=0, overflow='drop_newest', overflow_timeout=None,
+                 overflow_level=None):
+        if async_mode not in self.async_modes:
+            raise ValueError("Unknown async_mode: {0!r}".format(async_mode))
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1, not {0!r}".format(batch_size))
+        if overflow not in self.overflow_policies:
+            raise ValueError("Unknown overflow: {0!r}".format(overflow))
+        if overflow == 'drop_below' and overflow_level is None:
+            raise ValueError("overflow='drop_below' requires an overflow_level")
+        if overflow == 'drop_oldest' and async_mode != 'thread':
+            # only the writer process can take messages from its queue or ring
+            raise ValueError("overflow='drop_oldest' requires async_mode='thread'")
+
         self._format = format if format is not None else self._noop_format
+        self.async_mode = async_mode
+        self.batch_size = batch_size
+        self.linger = linger
+        self.overflow = overflow
+        self.overflow_timeout = overflow_timeout
+        self.overflow_level = overflow_level
+        self.dropped = 0
+        self.__unreported = 0
+        self.__reported_at = None
+        self.__drop_lock = threading.Lock()
         if msg_buffer == 0:
             self._sync_init()
+        elif async_mode == 'thread':
+            self._thread_init(msg_buffer, close_atexit)
+        elif async_mode == 'shared_memory':
+            self._ring_init(close_atexit)
         else:
             self._async_init(msg_buffer, close_atexit)
 
@@ -88,28 +161,295 @@ class AsyncOutput(Output):
     @staticmethod
     def __child_main(self):
         self._open()
+        queue, batch_size, linger = self.__queue, self.batch_size, self.linger
         while True:
             # XXX should _close() be in a finally: ?
-            msg = self.__queue.get()
-            if msg != "SHUTDOWN":
-                x = self._format(msg)
-                self._write(x)
-                del x, msg
-                self.__queue.task_done()
-            else:
-                assert self.__queue.empty(), "Shutdown but queue not empty"
+            batch = [queue.get()]
+            deadline = time.time() + linger
+            while len(batch) < batch_size and batch[-1] != "SHUTDOWN":
+                try:
+                    if linger:
+                        batch.append(queue.get(timeout=max(deadline - time.time(), 0)))
+                    else:
+                        batch.append(queue.get_nowait())
+                except Empty:
+                    break
+
+            shutdown = batch[-1] == "SHUTDOWN"
+            if shutdown:
+                batch.pop()
+            self._output_encoded_batch(batch)
+            for msg in batch:
+                queue.task_done()
+            del batch
+
+            if shutdown:
+                assert queue.empty(), "Shutdown but queue not empty"
                 self._close()
-                self.__queue.task_done()
+                queue.task_done()
                 break
 
     def __async_output(self, msg):
-        self.__queue.put_nowait(msg)
+        # encoding substitutes the text now, before the caller can change its arguments, and
+        # the bytes are much cheaper to pickle than the message
+        data = msg.encode()
+        if not self.__async_put(data):
+            self.__overflow(msg, data, self.__async_put, None)
+
+    def __async_put(self, data):
+        try:
+            self.__queue.put_nowait(data)
+        except Full:
+            return False
+        return True
 
     def __async_close(self):
-        self.__queue.put_nowait("SHUTDOWN")  # XXX maybe just put?
+        self.__report_drops()
+        # wait for room, as the buffer may well be full
+        self.__queue.put("SHUTDOWN")
         self.__queue.close()
         self.__queue.join()
 
+    def _thread_init(self, msg_buffer, close_atexit):
+        """the guts of init for a writer thread - for internal use
+
+        Messages are passed in a plain deque, which is threadsafe for appending & popping, so
+        logging doesn't take a lock unless the writer thread is idle and needs waking.
+        """
+        self.output = self.__thread_output
+        self.close = self.__thread_close
+        self.__messages = collections.deque()
+        self.__maxlen = max(msg_buffer, 0)  # negative means unlimited
+        self.__wakeup = threading.Event()
+        self.__idle = False
+        # open here, so errors are raised to the caller
+        self._open()
+        self.__thread = threading.Thread(target=self.__thread_main,
+                                         name="twiggy-{0}".format(self.__class__.__name__))
+        # the interpreter joins non-daemon threads before calling atexit, so closing there
+        # would never happen. Messages not yet written when exiting without close() are lost.
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def __thread_main(self):
+        messages, wakeup = self.__messages, self.__wakeup
+        batch_size, linger = self.batch_size, self.linger
+        while True:
+            batch = []
+            shutdown = False
+            deadline = None  # when lingering for this batch ends
+            while len(batch) < batch_size:
+                try:
+                    msg = messages.popleft()
+                except IndexError:
+                    if not batch:
+                        timeout = None
+                    elif linger:
+                        timeout = deadline - time.time()
+                        if timeout <= 0:
+                            break
+                    else:
+                        break
+
+                    # mark ourselves idle before checking again, so a message appended after
+                    # this check is sure to wake us
+                    self.__idle = True
+                    if not messages:
+                        wakeup.wait(timeout)
+                        wakeup.clear()
+                    self.__idle = False
+                    continue
+
+                if msg is _SHUTDOWN:
+                    shutdown = True
+                    break
+                if deadline is None:
+                    deadline = time.time() + linger
+                batch.append(msg)
+
+            if batch:
+                self._output_batch(batch)
+            del batch
+
+            if shutdown:
+                assert not messages, "Shutdown but queue not empty"
+                self._close()
+                break
+
+    def __thread_output(self, msg):
+        # substitute now, in the caller's thread, before it can change its arguments
+        msg.text
+        if not self.__thread_put(msg):
+            self.__overflow(msg, msg, self.__thread_put, self.__thread_discard)
+
+    def __thread_put(self, msg):
+        messages = self.__messages
+        if self.__maxlen and len(messages) >= self.__maxlen:
+            return False
+        messages.append(msg)
+        if self.__idle:
+            self.__wakeup.set()
+        return True
+
+    def __thread_discard(self):
+        try:
+            self.__messages.popleft()
+        except IndexError:
+            return False
+        return True
+
+    def __thread_close(self):
+        self.__report_drops()
+        self.__messages.append(_SHUTDOWN)
+        self.__wakeup.set()
+        self.__thread.join()
+
+    def _ring_init(self, close_atexit):
+        """the guts of init for a child process reading from shared memory - for internal use
+
+        Messages are encoded with `.Message.encode` and copied into a `.SharedRing`. Nothing is
+        pickled, and logging makes no system calls.
+        """
+        self.output = self.__ring_output
+        self.close = self.__ring_close
+        self.__ring = SharedRing(self.ring_size)
+        # the ring allows only a single writer
+        self.__ring_lock = threading.Lock()
+        self.__child = multiprocessing.Process(target=self.__ring_main, args=(self, ))
+        self.__child.daemon = not close_atexit
+        self.__child.start()
+
+    # use a plain function so Windows is cool
+    @staticmethod
+    def __ring_main(self):
+        ring, batch_size, linger = self.__ring, self.batch_size, self.linger
+        self._open()
+        while ring.wait():
+            batch = [ring.get()]
+            deadline = time.time() + linger
+            while len(batch) < batch_size:
+                record = ring.get()
+                if record is None:
+                    if linger and ring.wait(deadline - time.time()):
+                        continue
+                    break
+                batch.append(record)
+
+            self._output_encoded_batch(batch)
+            del batch
+
+        # whatever the writer put before closing
+        batch = list(iter(ring.get, None))
+        if batch:
+            self._output_encoded_batch(batch)
+        self._close()
+        ring.close()
+
+    def __ring_output(self, msg):
+        data = msg.encode()
+        if not self.__ring_put(data):
+            self.__overflow(msg, data, self.__ring_put, None)
+
+    def __ring_put(self, data):
+        with self.__ring_lock:
+            return self.__ring.put(data)
+
+    def __ring_close(self):
+        self.__report_drops()
+        self.__ring.close_writer()
+        self.__child.join()
+        self.__ring.close()
+
+    def __overflow(self, msg, item, put, discard):
+        """apply the ``overflow`` policy when the buffer is full
+
+        :arg msg: the message being output
+        :arg item: what to buffer for it
+        :arg put: a callable that buffers ``item``, returning False if there's no room
+        :arg discard: a callable that drops the oldest buffered item, returning False if there
+            wasn't one. Only needed for ``drop_oldest``.
+        """
+        overflow = self.overflow
+        if overflow == 'drop_oldest':
+            while not put(item):
+                if discard():
+                    self.__dropped()
+            return
+
+        if overflow == 'drop_newest' or (overflow == 'drop_below' and
+                                         msg.level < self.overflow_level):
+            self.__dropped()
+            return
+
+        # block, for all messages or those at or above overflow_level. There's no cheap way to
+        # be woken by every kind of writer, so poll, backing off up to a millisecond.
+        timeout = self.overflow_timeout
+        deadline = None if timeout is None else time.time() + timeout
+        delay = 0
+        while not put(item):
+            if deadline is not None and time.time() >= deadline:
+                self.__dropped()
+                return
+            time.sleep(delay)
+            delay = min(delay * 2 or 0.00005, 0.001)
+
+    def __dropped(self):
+        """count a dropped message, reporting them at most every `.drop_report_interval`
+        seconds
+        """
+        with self.__drop_lock:
+            self.dropped += 1
+            self.__unreported += 1
+            now = time.time()
+            if (self.__reported_at is not None and
+                    now - self.__reported_at < self.drop_report_interval):
+                return
+            self.__reported_at = now
+        self.__report_drops()
+
+    def __report_drops(self):
+        """report messages dropped since the last report, as a single message"""
+        with self.__drop_lock:
+            unreported, self.__unreported = self.__unreported, 0
+        if unreported:
+            # import here to avoid a circular import
+            from .logger import internal_log
+            internal_log.warning("{0!r} dropped {1} messages because its buffer was full;"
+                                 " {2} in all", self, unreported, self.dropped)
+
+    def _output_batch(self, msgs):
+        """format ``msgs`` & write them with `._write_batch` - for internal use
+
+        Errors are reported to `.internal_log`; messages which can't be formatted are skipped.
+        """
+        xs = []
+        for msg in msgs:
+            try:
+                xs.append(msg._format_with(self._format))
+            except Exception:
+                self.__report_error(msg)
+        try:
+            self._write_batch(xs)
+        except Exception:
+            self.__report_error(msgs)
+
+    def _output_encoded_batch(self, records):
+        """decode ``records`` from `.Message.encode` & output them with `._output_batch` - for
+        internal use
+        """
+        msgs = []
+        for record in records:
+            try:
+                msgs.append(Message.decode(record))
+            except Exception:
+                self.__report_error(record)
+        self._output_batch(msgs)
+
+    def __report_error(self, msg):
+        # import here to avoid a circular import
+        from .logger import internal_log
+        internal_log.warning("Error outputting with {0!r}. Message: {1!r}", self, msg)
+
 
 class NullOutput(Output):
     """An output that just discards its messages"""
@@ -146,26 +486,566 @@ class ListOutput(Output):
         del self.messages[:]
 
 
+class _UrgentText(text_type):
+    """formatted text of a message at or above `.FileOutput.flush_level` - for internal use"""
+
+    __slots__ = ()
+
+
+class _UrgentBytes(binary_type):
+    """formatted bytes of a message at or above `.FileOutput.flush_level` - for internal use"""
+
+    __slots__ = ()
+
+
+_urgent = (_UrgentText, _UrgentBytes)
+
+
+class _RawFile(object):
+    """a file descriptor opened for appending, with enough of a file's interface for
+    `.FileOutput` - for internal use
+
+    Each write is a single :func:`os.write`, unless the OS writes less.
+    """
+
+    def __init__(self, name, mode, encoding):
+        flags = os.O_WRONLY | os.O_CREAT | getattr(os, 'O_BINARY', 0)
+        flags |= os.O_TRUNC if mode.startswith('w') else os.O_APPEND
+        self.fd = os.open(name, flags, 0o666)
+        self.encoding = encoding
+
+    def write(self, x):
+        if not isinstance(x, binary_type):
+            x = x.encode(self.encoding, 'backslashreplace')
+        _write_fd(self.fd, x)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _write_fd(fd, data):
+    """write all of ``data`` to ``fd`` - for internal use"""
+    n = os.write(fd, data)
+    while n < len(data):
+        data = data[n:]
+        n = os.write(fd, data)
+
+
+def _join(xs):
+    """join formatted text or bytes - for internal use"""
+    return xs[0][:0].join(xs) if xs else ''
+
+
 class FileOutput(AsyncOutput):
     """Output messages to a file
 
-    ``name``, ``mode``, ``buffering`` are passed to :func:`open`
+    ``name``, ``mode``, ``buffering`` are passed to :func:`open`. ``msg_buffer`` and other
+    keyword arguments, such as ``async_mode`` and ``overflow``, are passed to `.AsyncOutput`.
+
+    With block buffering, a flush policy bounds how long messages sit unwritten:
+
+    :arg int flush_bytes: flush once this many bytes (characters, in text mode) are unflushed
+    :arg float flush_interval: seconds between flushes of unflushed messages by a timer thread,
+        in the process that writes
+    :arg LogLevel flush_level: flush right after writing a message at or above this level
+
+    Instead of a buffered text file, messages may be written with :func:`os.write` to a file
+    descriptor opened with ``O_APPEND``. ``buffering`` and flushing don't apply.
+
+    :arg bool raw: write to a file descriptor. Always true for formats that return bytes, such
+        as a `.LineFormat` with an ``encoding``.
+    :arg str encoding: the encoding of text from ``format``, when ``raw``. Each batch is
+        encoded at once.
     """
 
-    def __init__(self, name, format, mode='a', buffering=1, msg_buffer=0, close_atexit=True):
+    def __init__(self, name, format, mode='a', buffering=1, msg_buffer=0, close_atexit=True,
+                 flush_bytes=None, flush_interval=None, flush_level=None, raw=False,
+                 encoding='utf-8', **kwargs):
         self.filename = name
         self.mode = mode
         self.buffering = buffering
-        super(FileOutput, self).__init__(format, msg_buffer, close_atexit)
+        self.raw = raw or getattr(format, 'binary', False)
+        self.encoding = encoding
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.flush_level = flush_level
+        if flush_level is not None:
+            self._inner_format = format
+            format = self._flag_urgent
+        super(FileOutput, self).__init__(format, msg_buffer, close_atexit, **kwargs)
+
+    def _flag_urgent(self, msg):
+        """format ``msg``, marking it to be flushed if it's at or above `.flush_level` - for
+        internal use
+        """
+        x = msg._format_with(self._inner_format)
+        if msg.level >= self.flush_level:
+            x = _UrgentBytes(x) if isinstance(x, binary_type) else _UrgentText(x)
+        return x
+
+    def _open_file(self):
+        """open `.filename` for writing - for internal use"""
+        if self.raw:
+            return _RawFile(self.filename, self.mode, self.encoding)
+        return open(self.filename, self.mode, self.buffering)
+
+    def _open(self):
+        self.file = self._open_file()
+        self._unflushed = 0
+        # the timer flushes from its own thread
+        self._flush_lock = threading.Lock()
+        if self.flush_interval:
+            self._flush_stop = threading.Event()
+            self._flusher = threading.Thread(target=self._flush_main,
+                                             name="twiggy-flush-{0}".format(self.filename))
+            self._flusher.daemon = True
+            self._flusher.start()
+
+    def _close(self):
+        if self.flush_interval:
+            self._flush_stop.set()
+            self._flusher.join()
+        self.file.close()
+
+    def _flush_main(self):
+        """flush every `.flush_interval` seconds, until closed - for internal use"""
+        while not self._flush_stop.wait(self.flush_interval):
+            with self._flush_lock:
+                if self._unflushed:
+                    self._flush()
+
+    def _flush(self):
+        self.file.flush()
+        self._unflushed = 0
+
+    def _wrote(self, n, urgent):
+        """apply the flush policy after writing ``n`` bytes - for internal use"""
+        self._unflushed += n
+        if urgent or (self.flush_bytes is not None and self._unflushed >= self.flush_bytes):
+            self._flush()
+
+    def _write(self, x):
+        with self._flush_lock:
+            self.file.write(x)
+            self._wrote(len(x), isinstance(x, _urgent))
+
+    def _write_batch(self, xs):
+        urgent = self.flush_level is not None and any(isinstance(x, _urgent) for x in xs)
+        # a single write, so a line-buffered file flushes once
+        x = _join(xs)
+        with self._flush_lock:
+            self.file.write(x)
+            self._wrote(len(x), urgent)
+
+
+class RotatingFileOutput(FileOutput):
+    """Output messages to a file, rotated by size or time
+
+    When it's due, the file is renamed to a segment named for the UTC time,
+    ``name.YYYYmmddTHHMMSS.ffffff``, and reopened. This happens in the writer, between writes,
+    so it takes no lock in asynchronous modes. A background thread compresses closed segments
+    & deletes old ones.
+
+    Other arguments and keyword arguments are passed to `.FileOutput`.
+
+    :arg int max_bytes: rotate once the file reaches this many bytes (characters, in text mode)
+    :arg float interval: rotate at multiples of this many seconds since the epoch, such as
+        ``86400`` for midnight UTC
+    :arg int backup_count: how many segments to keep. None keeps them all.
+    :arg str compress: ``gzip``, ``lzma`` (Python 3), or None to leave segments uncompressed
+    """
+
+    #: supported values of ``compress``, and the suffixes they add
+    compressions = {'gzip': '.gz', 'lzma': '.xz'}
+
+    def __init__(self, name, format, max_bytes=None, interval=None, backup_count=7,
+                 compress=None, **kwargs):
+        if compress is not None and compress not in self.compressions:
+            raise ValueError("Unknown compress: {0!r}".format(compress))
+        if compress == 'lzma' and lzma is None:  # pragma: no cover
+            raise ValueError("compress='lzma' requires the lzma module")
+
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.backup_count = backup_count
+        self.compress = compress
+        directory, base = os.path.split(os.path.abspath(name))
+        self._directory = directory
+        self._segment_re = re.compile(
+            re.escape(base) + r"\.\d{8}T\d{6}\.\d{6}(\.gz|\.xz)?$")
+        super(RotatingFileOutput, self).__init__(name, format, **kwargs)
 
     def _open(self):
-        self.file = open(self.filename, self.mode, self.buffering)
+        super(RotatingFileOutput, self)._open()
+        self._size = os.path.getsize(self.filename)
+        self._schedule()
+        self._segments = Queue()
+        self._maintainer = threading.Thread(target=self._maintain_main,
+                                            name="twiggy-rotate-{0}".format(self.filename))
+        self._maintainer.daemon = True
+        self._maintainer.start()
 
     def _close(self):
+        super(RotatingFileOutput, self)._close()
+        # finish compressing
+        self._segments.put(None)
+        self._maintainer.join()
+
+    def _schedule(self):
+        """set when to rotate by time - for internal use"""
+        if self.interval:
+            self._rotate_at = (time.time() // self.interval + 1) * self.interval
+        else:
+            self._rotate_at = None
+
+    def _wrote(self, n, urgent):
+        super(RotatingFileOutput, self)._wrote(n, urgent)
+        self._size += n
+        if ((self.max_bytes is not None and self._size >= self.max_bytes) or
+                (self._rotate_at is not None and time.time() >= self._rotate_at)):
+            self._rotate()
+
+    def _rotate(self):
+        """rename the file to a new segment & reopen it - for internal use"""
         self.file.close()
+        now = time.time()
+        while True:
+            segment = "{0}.{1}.{2:06d}".format(self.filename,
+                                               time.strftime("%Y%m%dT%H%M%S", time.gmtime(now)),
+                                               int(now % 1 * 1000000))
+            if not os.path.exists(segment):
+                break
+            now += 0.000001
+        os.rename(self.filename, segment)
+        self.file = self._open_file()
+        self._unflushed = self._size = 0
+        self._schedule()
+        self._segments.put(segment)
+
+    def _maintain_main(self):
+        """compress segments & delete old ones, until closed - for internal use"""
+        while True:
+            segment = self._segments.get()
+            if segment is None:
+                break
+            try:
+                if self.compress is not None:
+                    self._compress(segment)
+                self._prune()
+            except Exception:
+                # import here to avoid a circular import
+                from .logger import internal_log
+                internal_log.warning("Error maintaining segment {0!r} of {1!r}", segment, self)
+
+    def _compress(self, segment):
+        """compress ``segment``, replacing it - for internal use"""
+        target = segment + self.compressions[self.compress]
+        opener = gzip.open if self.compress == 'gzip' else lzma.open
+        tmp = target + '.tmp'
+        with open(segment, 'rb') as src:
+            with opener(tmp, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+        os.rename(tmp, target)
+        os.remove(segment)
+
+    def segments(self):
+        """the paths of the segments kept, oldest first"""
+        return sorted(os.path.join(self._directory, f) for f in os.listdir(self._directory)
+                      if self._segment_re.match(f))
+
+    def _prune(self):
+        """delete the oldest segments beyond `.backup_count` - for internal use"""
+        if self.backup_count is None:
+            return
+        segments = self.segments()
+        for segment in segments[:max(len(segments) - self.backup_count, 0)]:
+            os.remove(segment)
+
+
+class MmapOutput(AsyncOutput):
+    """Output messages to a memory-mapped file
+
+    Formatted messages are copied into a shared mapping of the file, which the OS writes back,
+    so writing makes no system calls until the mapping has to grow. It grows by `.chunk_size`
+    bytes at a time, preallocated with :func:`os.posix_fallocate` where available, and the file
+    is truncated to the length written by `.close`.
+
+    If the process dies without closing, what was written is still in the file, followed by
+    zeros up to the end of the last chunk. Opening the file again trims those, and appends
+    after what was written.
+
+    ``msg_buffer`` and other keyword arguments are passed to `.AsyncOutput`.
+
+    :arg str name: the file name
+    :arg str encoding: the encoding of text returned by ``format``
+    """
+
+    #: bytes to grow the file by at a time
+    chunk_size = 1 << 24
+
+    def __init__(self, name, format, encoding='utf-8', msg_buffer=0, close_atexit=True,
+                 **kwargs):
+        self.filename = name
+        self.encoding = encoding
+        super(MmapOutput, self).__init__(format, msg_buffer, close_atexit, **kwargs)
+
+    def _open(self):
+        self._fd = os.open(self.filename, os.O_RDWR | os.O_CREAT, 0o666)
+        self._map = None
+        self._length = self._written_length()
+        self._map_size(self._length)
+
+    def _written_length(self):
+        """the length of the file, less any zeros left by dying without closing - for internal
+        use
+        """
+        end = os.fstat(self._fd).st_size
+        while end:
+            start = max(end - self.chunk_size, 0)
+            os.lseek(self._fd, start, os.SEEK_SET)
+            data = os.read(self._fd, end - start).rstrip(b'\0')
+            if data:
+                return start + len(data)
+            end = start
+        return 0
+
+    def _map_size(self, needed):
+        """map enough of the file for ``needed`` bytes, growing it by whole chunks - for
+        internal use
+        """
+        size = (needed // self.chunk_size + 1) * self.chunk_size
+        if self._map is not None:
+            self._map.close()
+        if hasattr(os, 'posix_fallocate'):
+            os.posix_fallocate(self._fd, 0, size)
+        else:  # pragma: no cover
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+
+    def _close(self):
+        self._map.flush()
+        self._map.close()
+        os.ftruncate(self._fd, self._length)
+        os.close(self._fd)
+
+    def _write(self, x):
+        if not isinstance(x, binary_type):
+            x = x.encode(self.encoding)
+        start = self._length
+        end = start + len(x)
+        if end > len(self._map):
+            self._map_size(end)
+        self._map[start:end] = x
+        self._length = end
+
+    def _write_batch(self, xs):
+        # a single copy
+        if xs:
+            self._write(_join(xs))
+
+
+class SocketOutput(AsyncOutput):
+    """Base class for outputs sending messages over a socket
+
+    The socket is connected when first needed, and reused. If connecting or sending fails, the
+    socket is closed, and it isn't connected again until after a backoff, which doubles from
+    `.backoff_initial` seconds after each failure, up to `.backoff_max`. A stale connection is
+    retried at once. Failures are reported to `.internal_log`, and messages which couldn't be
+    sent are counted in `.unsent` (in the process that writes) and dropped.
+
+    Text from ``format`` is encoded with ``encoding``; formats may return bytes instead, such as
+    `.SyslogFormat`. ``msg_buffer`` and other keyword arguments are passed to `.AsyncOutput`;
+    in asynchronous modes, each batch of messages is framed & sent together.
+
+    :arg address: a ``(host, port)`` tuple, or the path of a unix socket
+    :arg float timeout: seconds to wait for connecting & sending
+    """
+
+    #: seconds to wait before connecting again after the first failure
+    backoff_initial = 0.1
+
+    #: the most seconds to wait before connecting again
+    backoff_max = 30
+
+    def __init__(self, address, format, timeout=5, encoding='utf-8', msg_buffer=0,
+                 close_atexit=True, **kwargs):
+        self.address = address
+        self.timeout = timeout
+        self.encoding = encoding
+        self.unsent = 0
+        super(SocketOutput, self).__init__(format, msg_buffer, close_atexit, **kwargs)
+
+    def _open(self):
+        self._sock = None
+        self._backoff = 0
+        self._retry_at = 0
+
+    def _close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def _connect(self):
+        """return a new, connected socket"""
+        raise NotImplementedError
+
+    def _frame(self, data):
+        """return a list of payloads to send for a list of encoded messages"""
+        raise NotImplementedError
+
+    def _send(self, sock, payload):
+        """send one payload"""
+        raise NotImplementedError
+
+    def _socket_address(self, type):
+        """the family & address to connect a socket of ``type`` to - for internal use"""
+        if isinstance(self.address, (text_type, binary_type)):
+            return socket.AF_UNIX, self.address
+        host, port = self.address
+        family, _, _, _, sockaddr = socket.getaddrinfo(host, port, 0, type)[0]
+        return family, sockaddr
 
     def _write(self, x):
-        self.file.write(x)
+        self._write_batch([x])
+
+    def _write_batch(self, xs):
+        if not xs:
+            return
+        payloads = self._frame([x if isinstance(x, binary_type) else
+                                x.encode(self.encoding, 'backslashreplace') for x in xs])
+
+        # a connection that's been idle may have been closed at the other end, so retry once
+        attempts = 2 if self._sock is not None else 1
+        for attempt in range(attempts):
+            if self._sock is None:
+                if time.time() < self._retry_at:
+                    break
+                try:
+                    self._sock = self._connect()
+                except EnvironmentError:
+                    self._failed()
+                    break
+            try:
+                for payload in payloads:
+                    self._send(self._sock, payload)
+            except EnvironmentError:
+                self._failed(attempt + 1 < attempts)
+            else:
+                self._backoff = 0
+                return
+        self.unsent += len(xs)
+
+    def _failed(self, retry=False):
+        """close the socket after an error, and back off unless retrying - for internal use"""
+        self._close()
+        if retry:
+            return
+        self._backoff = min(self._backoff * 2 or self.backoff_initial, self.backoff_max)
+        self._retry_at = time.time() + self._backoff
+        # import here to avoid a circular import
+        from .logger import internal_log
+        internal_log.warning("Error sending with {0!r} to {1!r}: {2}. Retrying in {3} seconds",
+                             self, self.address, sys.exc_info()[1], self._backoff)
+
+
+class DatagramOutput(SocketOutput):
+    """Output messages as datagrams, over UDP or a unix datagram socket
+
+    By default, each message is a datagram, truncated to ``mtu`` bytes, as RFC 5426 expects for
+    syslog. Other arguments and keyword arguments are passed to `.SocketOutput`.
+
+    :arg int mtu: the most bytes to send in a datagram. If None, 1472 for UDP (a 1500 byte
+        Ethernet frame) or 8192 for a unix socket.
+    :arg bool pack: send as many messages as fit in a datagram, separated by newlines, for
+        collectors which split them.
+    """
+
+    def __init__(self, address, format, mtu=None, pack=False, **kwargs):
+        if mtu is None:
+            mtu = 8192 if isinstance(address, (text_type, binary_type)) else 1472
+        self.mtu = mtu
+        self.pack = pack
+        super(DatagramOutput, self).__init__(address, format, **kwargs)
+
+    def _connect(self):
+        family, address = self._socket_address(socket.SOCK_DGRAM)
+        sock = socket.socket(family, socket.SOCK_DGRAM)
+        try:
+            sock.settimeout(self.timeout)
+            # so errors from the other end are reported
+            sock.connect(address)
+        except Exception:
+            sock.close()
+            raise
+        return sock
+
+    def _frame(self, data):
+        mtu = self.mtu
+        if not self.pack:
+            return [d[:mtu] for d in data]
+
+        # size is that of the packet's messages joined by newlines
+        packets, packet, size = [], [], -1
+        for d in data:
+            d = d.rstrip(b'\n')[:mtu]
+            if packet and size + 1 + len(d) > mtu:
+                packets.append(b'\n'.join(packet))
+                packet, size = [], -1
+            packet.append(d)
+            size += 1 + len(d)
+        packets.append(b'\n'.join(packet))
+        return packets
+
+    def _send(self, sock, payload):
+        sock.send(payload)
+
+
+class TCPOutput(SocketOutput):
+    """Output messages over a persistent TCP (or unix stream socket) connection
+
+    Each batch of messages is framed and sent with a single :meth:`socket.sendall`, leaving
+    the OS to split it into segments. Other arguments and keyword arguments are passed to
+    `.SocketOutput`.
+
+    :arg str framing: ``newline`` ends each message with a newline, unless it has one.
+        ``octet`` prefixes each with its length and a space, as in RFC 6587 octet counting.
+    """
+
+    #: supported values of ``framing``
+    framings = ('newline', 'octet')
+
+    def __init__(self, address, format, framing='newline', **kwargs):
+        if framing not in self.framings:
+            raise ValueError("Unknown framing: {0!r}".format(framing))
+        self.framing = framing
+        super(TCPOutput, self).__init__(address, format, **kwargs)
+
+    def _connect(self):
+        family, address = self._socket_address(socket.SOCK_STREAM)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.timeout)
+            sock.connect(address)
+            if family in (socket.AF_INET, socket.AF_INET6):
+                # batches are sent whole, so there's nothing to wait for
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except Exception:
+            sock.close()
+            raise
+        return sock
+
+    def _frame(self, data):
+        if self.framing == 'octet':
+            framed = [str(len(d)).encode('ascii') + b' ' + d for d in data]
+        else:
+            framed = [d if d.endswith(b'\n') else d + b'\n' for d in data]
+        return [b''.join(framed)]
+
+    def _send(self, sock, payload):
+        sock.sendall(payload)
 
 
 class StreamOutput(Output):
@@ -173,13 +1053,35 @@ class StreamOutput(Output):
 
     def __init__(self, format, stream=sys.stderr):
         self.stream = stream
+        self.binary = getattr(format, 'binary', False)
+        self.encoding = getattr(format, 'encoding', None) or 'utf-8'
         super(StreamOutput, self).__init__(format, False)  # close_atexit makes no sense here
 
     def _open(self):
-        pass
+        # bytes go straight to the stream's file descriptor, if it has one
+        self._fd = None
+        if self.binary:
+            try:
+                fd = self.stream.fileno()
+            except (AttributeError, ValueError, EnvironmentError):
+                # io.UnsupportedOperation is both of the latter
+                pass
+            else:
+                self._fd = fd
 
     def _close(self):
         pass
 
     def _write(self, x):
-        self.stream.write(x)
+        if self._fd is not None:
+            # so whatever's been written to the stream since, such as by print(), comes first
+            self.stream.flush()
+            _write_fd(self._fd, x)
+        elif self.binary:
+            self.stream.write(x.decode(self.encoding))
+        else:
+            self.stream.write(x)
+
+    def _write_batch(self, xs):
+        if xs:
+            self._write(_join(xs))